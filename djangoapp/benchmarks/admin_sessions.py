@@ -0,0 +1,81 @@
+"""
+Consultas à tabela django_session por requisição do admin para cada
+SESSION_ENGINE.
+
+    python -m benchmarks.admin_sessions --requests 50
+"""
+import argparse
+
+from benchmarks.common import setup, test_database
+
+ENGINES = ("db", "cached_db", "cache", "signed_cookies")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    setup()
+    from blog.models import Post
+    from django.contrib.auth.models import User
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+
+    urls = ("/admin/", "/admin/blog/post/", "/admin/blog/post/{pk}/change/")
+
+    with test_database(), override_settings(ALLOWED_HOSTS=["*"]):
+        user = User.objects.create_superuser("admin", password="x")
+        post = Post.objects.create(
+            title="Post", excerpt="e", content="c", created_by=user
+        )
+
+        for engine in ENGINES:
+            with override_settings(
+                SESSION_ENGINE=f"django.contrib.sessions.backends.{engine}"
+            ):
+                cache.clear()
+                client = Client()
+
+                with CaptureQueriesContext(connection) as queries:
+                    client.force_login(user)
+                    for request in range(args.requests):
+                        url = urls[request % len(urls)].format(pk=post.pk)
+                        assert client.get(url).status_code == 200
+                    # Um save com mensagem de sucesso no fim da sessão
+                    response = client.post(
+                        f"/admin/blog/post/{post.pk}/change/",
+                        {
+                            "title": "Post",
+                            "slug": post.slug,
+                            "excerpt": "e",
+                            "content": "c",
+                            "cover_in_post_content": "on",
+                        },
+                    )
+                    assert response.status_code == 302, response.status_code
+
+                sessions = [
+                    query["sql"]
+                    for query in queries.captured_queries
+                    if "django_session" in query["sql"]
+                ]
+                writes = [
+                    sql
+                    for sql in sessions
+                    if not sql.lstrip().upper().startswith("SELECT")
+                ]
+                # login + GETs + POST
+                total = args.requests + 2
+                print(
+                    f"{engine:<15} django_session: "
+                    f"{len(sessions) / total:5.2f} consultas/req  "
+                    f"{len(writes) / total:5.2f} escritas/req  "
+                    f"(todas as consultas: {len(queries) / total:5.2f}/req)"
+                )
+
+
+if __name__ == "__main__":
+    main()
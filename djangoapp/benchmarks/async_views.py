@@ -0,0 +1,120 @@
+"""
+Throughput das views do blog sob ASGI (uvicorn), síncronas x async.
+
+Sobe o uvicorn duas vezes (BLOG_ASYNC_VIEWS=0 e 1) contra o banco
+configurado no .env e dispara --concurrency clientes simultâneos:
+
+    python -m benchmarks.async_views --concurrency 500 --requests 5000 \
+        --path / --path /post/<slug>/
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+
+async def fetch(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n"
+    writer.write(request.encode())
+    await writer.drain()
+    status_line = await reader.readline()
+    await reader.read()
+    writer.close()
+    # Resposta vazia ou cortada (conexão fechada pelo servidor) conta como erro
+    parts = status_line.split()
+    if len(parts) < 2 or not parts[1].isdigit():
+        return None
+    return int(parts[1])
+
+
+async def load(host, port, paths, concurrency, total):
+    counter = iter(range(total))
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                status = await fetch(host, port, paths[i % len(paths)])
+            except OSError:
+                status = None
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start, sorted(latencies), errors
+
+
+def wait_port(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex((host, port)) == 0:
+                return
+        time.sleep(0.2)
+    raise RuntimeError(f"uvicorn não subiu em {host}:{port}")
+
+
+def run(label, async_views, args):
+    env = {**os.environ, "BLOG_ASYNC_VIEWS": "1" if async_views else "0"}
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "project.asgi:application",
+            "--host",
+            args.host,
+            "--port",
+            str(args.port),
+            "--log-level",
+            "warning",
+            "--backlog",
+            str(max(2048, args.concurrency * 2)),
+        ],
+        env=env,
+    )
+    try:
+        wait_port(args.host, args.port)
+        # Aquecimento: conexões com o banco, templates, cache
+        asyncio.run(load(args.host, args.port, args.path, 10, 50))
+        elapsed, latencies, errors = asyncio.run(
+            load(args.host, args.port, args.path, args.concurrency, args.requests)
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(
+        f"{label:<6} {args.requests / elapsed:8.1f} req/s  "
+        f"p50={p50:8.1f}ms  p99={p99:8.1f}ms  erros={errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--path", action="append")
+    args = parser.parse_args()
+    args.path = args.path or ["/"]
+
+    print(f"{args.concurrency} clientes, {args.requests} requisições: {args.path}")
+    run("sync", False, args)
+    run("async", True, args)
+
+
+if __name__ == "__main__":
+    main()
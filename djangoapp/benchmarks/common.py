@@ -0,0 +1,56 @@
+"""
+Utilitários compartilhados pelos benchmarks.
+
+Rode os scripts a partir de djangoapp/, por exemplo:
+
+    python -m benchmarks.media_throughput
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Cria um banco de teste descartável (como o manage.py test)."""
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def timed(func, repeat=5):
+    """Executa func `repeat` vezes e retorna os tempos em segundos."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label, timings, unit="ms", scale=1000):
+    print(
+        f"{label:<40} "
+        f"median={statistics.median(timings) * scale:9.2f}{unit} "
+        f"min={min(timings) * scale:9.2f}{unit} "
+        f"max={max(timings) * scale:9.2f}{unit}"
+    )
@@ -0,0 +1,95 @@
+"""
+Tempo de subida do projeto em um interpretador novo (django.setup(),
+aplicação WSGI e URLconf carregados), com o resumo do -X importtime por
+pacote. Use para acompanhar o cold start a cada release:
+
+    python -m benchmarks.importtime --repeat 5 --top 15
+    python -m benchmarks.importtime --json >> startup.jsonl
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from benchmarks.common import report
+
+BOOT = (
+    "import os;"
+    "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings');"
+    "from django.core.wsgi import get_wsgi_application;"
+    "get_wsgi_application();"
+    "from django.urls import get_resolver;"
+    "get_resolver().url_patterns"
+)
+
+# import time: self [us] | cumulative | imported package
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def boot(importtime=False):
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    start = time.perf_counter()
+    result = subprocess.run(
+        command + ["-c", BOOT],
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - start, result.stderr
+
+
+def imports_by_package(stderr):
+    """Soma o tempo próprio (self) dos módulos por pacote raiz, em segundos."""
+    packages = Counter()
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, _, _, name = match.groups()
+            packages[name.split(".")[0]] += int(self_us) / 1_000_000
+    return packages
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="Uma linha JSON.")
+    args = parser.parse_args()
+
+    # A primeira execução grava os .pyc que faltarem; não entra na conta
+    boot()
+    timings = [boot()[0] for _ in range(args.repeat)]
+    _, stderr = boot(importtime=True)
+    packages = imports_by_package(stderr)
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "startup_median_s": round(statistics.median(timings), 4),
+                    "imports_s": round(sum(packages.values()), 4),
+                    "packages_s": {
+                        name: round(seconds, 4)
+                        for name, seconds in packages.most_common(args.top)
+                    },
+                }
+            )
+        )
+        return
+
+    report("subida (setup + WSGI + URLconf)", timings)
+    print(f"\nimports: {sum(packages.values()) * 1000:.1f}ms no total")
+    for name, seconds in packages.most_common(args.top):
+        print(f"  {name:<30} {seconds * 1000:9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
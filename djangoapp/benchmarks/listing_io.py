@@ -0,0 +1,84 @@
+"""
+Custo das consultas da listagem (index) com o content fora da linha do
+Post (PostBody) e como era antes, com o content vindo junto em cada linha
+(simulado com select_related("body")).
+
+    python -m benchmarks.listing_io --posts 100000 --content-kb 8
+
+No Postgres também mostra o tamanho das tabelas blog_post e blog_postbody.
+"""
+import argparse
+
+from benchmarks.common import report, setup, test_database, timed
+
+PARAGRAPH = "<p>" + "lorem ipsum dolor sit amet " * 20 + "</p>\n"
+
+
+def seed(posts, content_kb):
+    from blog.models import Post, PostBody
+
+    content = PARAGRAPH * max(1, content_kb * 1024 // len(PARAGRAPH))
+    batch = 1000
+    for start in range(0, posts, batch):
+        created = Post.objects.bulk_create(
+            Post(
+                title=f"Post {number}",
+                slug=f"post-{number}",
+                excerpt="Resumo do post",
+                is_published=number % 10 != 0,
+            )
+            for number in range(start, min(start + batch, posts))
+        )
+        PostBody.objects.bulk_create(
+            PostBody(post=post, content=content) for post in created
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--content-kb", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    from blog.models import Post
+    from blog.views import PER_PAGE
+    from django.db import connection
+
+    with test_database():
+        seed(args.posts, args.content_kb)
+        published = Post.objects.get_published().order_by("-created_at")
+        last_page = (published.count() - 1) // PER_PAGE
+
+        layouts = (
+            ("content em PostBody", published),
+            ("content na linha (antes)", published.select_related("body")),
+        )
+        for label, queryset in layouts:
+            for page in (0, last_page // 2, last_page):
+                offset = page * PER_PAGE
+                window = queryset[offset : offset + PER_PAGE]
+
+                def list_page():
+                    return list(window.all())
+
+                sql, params = window.query.sql_with_params()
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, params)
+                    size = sum(len(str(value)) for row in cursor for value in row)
+
+                report(f"{label} pág {page + 1}", timed(list_page, args.repeat))
+                print(f"{'':<40} {size / 1024:9.1f}KB lidos por página")
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                for table in ("blog_post", "blog_postbody"):
+                    cursor.execute(
+                        "SELECT pg_size_pretty(pg_total_relation_size(%s))", [table]
+                    )
+                    print(f"{table:<20} {cursor.fetchone()[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Throughput de tentativas de login erradas no admin (credential stuffing)
+com o handler do django-axes no banco e no cache.
+
+    python -m benchmarks.login_attack --attempts 500 --ips 100
+"""
+import argparse
+import time
+
+from benchmarks.common import setup, test_database
+
+HANDLERS = (
+    ("database", "axes.handlers.database.AxesDatabaseHandler"),
+    ("cache", "axes.handlers.cache.AxesCacheHandler"),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--attempts", type=int, default=500)
+    parser.add_argument(
+        "--ips", type=int, default=100, help="Endereços diferentes atacando."
+    )
+    args = parser.parse_args()
+
+    setup()
+    from axes.handlers.proxy import AxesProxyHandler
+    from django.contrib.auth.models import User
+    from django.core.cache import caches
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+
+    # Sem o PBKDF2 o tempo medido é o do axes, não o do hash da senha
+    fast_hashers = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+    with test_database(), override_settings(PASSWORD_HASHERS=fast_hashers):
+        User.objects.create_user("admin", password="correct-horse")
+        client = Client()
+
+        for label, handler in HANDLERS:
+            with override_settings(AXES_HANDLER=handler, ALLOWED_HOSTS=["*"]):
+                AxesProxyHandler.get_implementation(force=True)
+                caches["axes"].clear()
+
+                statuses = {}
+                start = time.perf_counter()
+                with CaptureQueriesContext(connection) as queries:
+                    for attempt in range(args.attempts):
+                        host = attempt % args.ips
+                        ip = f"10.0.{host // 256}.{host % 256}"
+                        response = client.post(
+                            "/admin/login/",
+                            {"username": "admin", "password": f"wrong-{attempt}"},
+                            REMOTE_ADDR=ip,
+                        )
+                        statuses[response.status_code] = (
+                            statuses.get(response.status_code, 0) + 1
+                        )
+                elapsed = time.perf_counter() - start
+
+                writes = sum(
+                    not query["sql"].lstrip().upper().startswith("SELECT")
+                    for query in queries.captured_queries
+                )
+                print(
+                    f"{label:<10} {args.attempts / elapsed:8.1f} tentativas/s  "
+                    f"queries/tentativa={len(queries) / args.attempts:5.2f}  "
+                    f"escritas/tentativa={writes / args.attempts:5.2f}  "
+                    f"status={statuses}"
+                )
+
+        AxesProxyHandler.get_implementation(force=True)
+
+
+if __name__ == "__main__":
+    main()
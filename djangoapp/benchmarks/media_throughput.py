@@ -0,0 +1,66 @@
+"""
+Throughput de utils.media.serve_media para anexos grandes.
+
+    python -m benchmarks.media_throughput --size-mb 64 --repeat 5
+"""
+import argparse
+import os
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import report, setup, timed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+    from django.test import Client, override_settings
+
+    size = args.size_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory() as media_root:
+        name = "posts/2023/10/attachment.bin"
+        target = Path(media_root) / name
+        target.parent.mkdir(parents=True)
+        with target.open("wb") as file:
+            for _ in range(args.size_mb):
+                file.write(os.urandom(1024 * 1024))
+
+        client = Client()
+        url = f"/media/{name}"
+
+        def download(**headers):
+            def run():
+                response = client.get(url, headers=headers)
+                assert response.status_code in (200, 206), response.status_code
+                if response.streaming:
+                    for _ in response.streaming_content:
+                        pass
+                response.close()
+
+            return run
+
+        with override_settings(MEDIA_ROOT=Path(media_root), ALLOWED_HOSTS=["*"]):
+            with override_settings(MEDIA_SERVE_MODE="django"):
+                timings = timed(download(), args.repeat)
+                report(f"full {args.size_mb}MB", timings)
+                print(f"{'':<40} {args.size_mb / min(timings):9.1f} MB/s")
+
+                half = size // 2
+                timings = timed(download(Range=f"bytes={half}-"), args.repeat)
+                report(f"range {args.size_mb // 2}MB", timings)
+                print(f"{'':<40} {args.size_mb / 2 / min(timings):9.1f} MB/s")
+
+                timings = timed(download(Range="bytes=0-1048575"), args.repeat)
+                report("range 1MB (seek)", timings)
+
+            with override_settings(MEDIA_SERVE_MODE="x-accel-redirect"):
+                timings = timed(download(), args.repeat * 20)
+                report("x-accel-redirect (headers only)", timings)
+
+
+if __name__ == "__main__":
+    main()
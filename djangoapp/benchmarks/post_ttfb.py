@@ -0,0 +1,79 @@
+"""
+Tempo até o primeiro byte (TTFB) e tempo total da página do post conforme
+o tamanho do content, com e sem BLOG_STREAM_POSTS.
+
+    python -m benchmarks.post_ttfb --sizes-kb 10,100,1000,5000 --repeat 5
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.common import setup, test_database
+
+ROW = "<tr><td>célula</td><td>{n}</td><td><img src='/media/x.jpg'></td></tr>"
+
+
+def make_content(size):
+    parts = []
+    total = 0
+    n = 0
+    while total < size:
+        part = f"<p>Parágrafo {n} " + "lorem ipsum " * 40 + "</p>"
+        part += "<table>" + "".join(ROW.format(n=i) for i in range(20)) + "</table>"
+        parts.append(part)
+        total += len(part)
+        n += 1
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes-kb", default="10,100,1000,5000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+    from blog.models import Post
+    from django.test import Client, override_settings
+
+    sizes = [int(size) for size in args.sizes_kb.split(",")]
+
+    with test_database(), override_settings(ALLOWED_HOSTS=["*"]):
+        client = Client()
+        for size in sizes:
+            post = Post.objects.create(
+                title=f"Post {size}KB",
+                excerpt="e",
+                content=make_content(size * 1024),
+                is_published=True,
+            )
+            url = post.get_absolute_url()
+
+            for stream in (False, True):
+                first_byte = []
+                total = []
+                with override_settings(BLOG_STREAM_POSTS=stream):
+                    for _ in range(args.repeat):
+                        start = time.perf_counter()
+                        response = client.get(url)
+                        if response.streaming:
+                            chunks = iter(response.streaming_content)
+                            next(chunks)
+                            first_byte.append(time.perf_counter() - start)
+                            for _ in chunks:
+                                pass
+                        else:
+                            first_byte.append(time.perf_counter() - start)
+                        total.append(time.perf_counter() - start)
+                        response.close()
+
+                label = "stream" if stream else "buffer"
+                print(
+                    f"{size:>6}KB {label}  "
+                    f"TTFB={statistics.median(first_byte) * 1000:8.2f}ms  "
+                    f"total={statistics.median(total) * 1000:8.2f}ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Espaço ocupado pelas revisões e tempo para reconstruir uma revisão depois
+de N saves de um post, comparado com guardar o content inteiro a cada save.
+
+    python -m benchmarks.revisions --revisions 1000 --size-kb 50 --every 1,10,20,50
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.common import setup, test_database
+
+PARAGRAPH = "<p>Parágrafo {n}: " + "lorem ipsum dolor sit amet " * 12 + "</p>\n"
+
+
+def make_content(size):
+    parts = []
+    total = 0
+    while total < size:
+        part = PARAGRAPH.format(n=len(parts))
+        parts.append(part)
+        total += len(part)
+    return parts
+
+
+def edit(parts, rng):
+    """Uma edição pequena, como as de um editor: troca, insere ou apaga."""
+    index = rng.randrange(len(parts))
+    action = rng.random()
+    if action < 0.6:
+        parts[index] = PARAGRAPH.format(n=f"{index} editado {rng.random():.6f}")
+    elif action < 0.85 or len(parts) < 2:
+        parts.insert(index, PARAGRAPH.format(n=f"novo {rng.random():.6f}"))
+    else:
+        del parts[index]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--revisions", type=int, default=1000)
+    parser.add_argument("--size-kb", type=int, default=50)
+    parser.add_argument("--every", default="1,10,20,50")
+    parser.add_argument("--samples", type=int, default=50)
+    args = parser.parse_args()
+
+    setup()
+    from blog.models import Post, Revision
+    from django.db.models import Sum
+    from django.test import override_settings
+
+    with test_database():
+        for every in [int(value) for value in args.every.split(",")]:
+            rng = random.Random(42)
+            parts = make_content(args.size_kb * 1024)
+            post = Post.objects.create(
+                title=f"Post {every}", excerpt="e", content="".join(parts)
+            )
+
+            record_times = []
+            with override_settings(BLOG_REVISION_CHECKPOINT_EVERY=every):
+                for _ in range(args.revisions):
+                    post.content = "".join(parts)
+                    start = time.perf_counter()
+                    Revision.objects.record(post)
+                    record_times.append(time.perf_counter() - start)
+                    edit(parts, rng)
+
+            history = Revision.objects.for_object(post)
+            revisions = list(history.defer("data"))
+            stored = sum(len(data) for data in history.values_list("data", flat=True))
+            full = history.aggregate(total=Sum("size"))["total"]
+
+            restore_times = []
+            for revision in rng.sample(revisions, min(args.samples, len(revisions))):
+                start = time.perf_counter()
+                revision.text()
+                restore_times.append(time.perf_counter() - start)
+
+            print(
+                f"checkpoint a cada {every:>3}: "
+                f"{stored / 1024:9.1f}KB guardados "
+                f"(cópias inteiras: {full / 1024:9.1f}KB, "
+                f"{stored / full * 100:5.1f}%)  "
+                f"record={statistics.median(record_times) * 1000:7.2f}ms  "
+                f"restore mediana={statistics.median(restore_times) * 1000:7.2f}ms "
+                f"máx={max(restore_times) * 1000:7.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
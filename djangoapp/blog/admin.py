@@ -1,7 +1,78 @@
-from blog.models import Category, Page, Post, Tag
-from django.contrib import admin
+from blog.models import AuthorProfile, Category, Page, Post, Revision, Tag
+from blog.signals import posts_changed
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django_summernote.admin import SummernoteModelAdmin
+from django_summernote.utils import get_config
+from django_summernote.widgets import SummernoteInplaceWidget, SummernoteWidget
+from utils.paginators import EstimatedCountPaginator
+
+
+class DeferContentChangeList(ChangeList):
+    """A listagem nunca mostra o content, então ele não sai do banco."""
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer("content")
+
+
+class CategoryListFilter(admin.SimpleListFilter):
+    """Filtro por categoria que lista só as primeiras `max_choices`."""
+
+    title = "category"
+    parameter_name = "category"
+    max_choices = 30
+
+    def lookups(self, request, model_admin):
+        categories = Category.objects.order_by("name").values_list("pk", "name")
+        choices = list(categories[: self.max_choices])
+        value = self.value()
+        if value and value.isdigit() and int(value) not in dict(choices):
+            choices += list(categories.filter(pk=value))
+        return choices
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value and value.isdigit():
+            return queryset.filter(category_id=value)
+        return queryset
+
+
+class LowQueryChangeListMixin:
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return DeferContentChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        # id e slug em search_fields viravam icontains/iexact, que não usam
+        # os índices; aqui eles são buscados com igualdade exata.
+        results, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        search_term = search_term.strip()
+        if search_term:
+            results |= queryset.filter(slug=search_term)
+        if search_term.isdigit():
+            results |= queryset.filter(pk=search_term)
+        return results, may_have_duplicates
+
+
+class RevisionMixin:
+    """Guarda uma revisão do content a cada save pelo admin."""
+
+    def save_model(self, request, obj, form, change):
+        if change and not Revision.objects.for_object(obj).exists():
+            # Objeto de antes do histórico: guarda o content que está no banco
+            Revision.objects.record(type(obj)._default_manager.get(pk=obj.pk))
+        super().save_model(request, obj, form, change)
+        Revision.objects.record(obj, request.user)
 
 
 @admin.register(Tag)
@@ -45,7 +116,7 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Page)
-class PageAdmin(SummernoteModelAdmin):
+class PageAdmin(LowQueryChangeListMixin, RevisionMixin, SummernoteModelAdmin):
     summernote_fields = ("content",)
     list_display = (
         "id",
@@ -53,14 +124,10 @@ class PageAdmin(SummernoteModelAdmin):
         "is_published",
     )
     list_display_links = ("title",)
-    search_fields = (
-        "id",
-        "slug",
-        "title",
-        "content",
-    )
+    search_fields = ("title",)
+    search_help_text = "Busca pelo título, slug exato ou id."
     list_per_page = 50
-    list_filter = ("is_published",)
+    list_filter = ("is_published", "site")
     list_editable = ("is_published",)
     ordering = ("-id",)
     prepopulated_fields = {
@@ -68,9 +135,158 @@ class PageAdmin(SummernoteModelAdmin):
     }
 
 
+@admin.register(AuthorProfile)
+class AuthorProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        "user",
+        "display_name",
+        "post_count",
+    )
+    list_display_links = ("display_name",)
+    list_select_related = ("user",)
+    search_fields = ("display_name",)
+    list_per_page = 50
+    ordering = ("display_name",)
+    # Nome e contagem vêm dos signals; só o avatar é editado aqui
+    readonly_fields = (
+        "user",
+        "display_name",
+        "post_count",
+        "updated_at",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(Revision)
+class RevisionAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "content_type",
+        "object_id",
+        "number",
+        "is_checkpoint",
+        "size",
+        "created_by",
+        "created_at",
+    )
+    list_filter = ("content_type", "is_checkpoint")
+    list_select_related = ("content_type", "created_by")
+    search_fields = ("=object_id",)
+    search_help_text = "Busca pelo id exato do post ou da página."
+    list_per_page = 50
+    ordering = ("-id",)
+    fields = (
+        "content_type",
+        "object_id",
+        "number",
+        "is_checkpoint",
+        "size",
+        "created_by",
+        "created_at",
+        "preview",
+    )
+    readonly_fields = fields
+    actions = ("restore",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer("data")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Content")
+    def preview(self, obj):
+        return format_html('<pre style="white-space: pre-wrap">{}</pre>', obj.text())
+
+    def has_restore_permission(self, request):
+        # A revisão em si é só leitura: restaurar é alterar o Post ou a Page
+        return request.user.has_perm("blog.change_post") or request.user.has_perm(
+            "blog.change_page"
+        )
+
+    @admin.action(
+        description="Restaurar revisão selecionada", permissions=("restore",)
+    )
+    def restore(self, request, queryset):
+        if queryset.count() != 1:
+            self.message_user(request, "Selecione uma única revisão.", messages.ERROR)
+            return
+        revision = queryset.first()
+        obj = revision.content_object
+        if obj is None:
+            self.message_user(request, "O objeto foi apagado.", messages.ERROR)
+            return
+        model_admin = self.admin_site._registry.get(type(obj))
+        if model_admin is None or not model_admin.has_change_permission(request, obj):
+            self.message_user(
+                request, f"Sem permissão para alterar {obj}.", messages.ERROR
+            )
+            return
+        obj.content = revision.text()
+        obj.save()
+        Revision.objects.record(obj, request.user)
+        self.message_user(request, f"{obj} voltou para a revisão {revision.number}.")
+
+
+class PostActionForm(ActionForm):
+    category = forms.ModelChoiceField(
+        Category.objects.only("pk", "name").order_by("name"),
+        required=False,
+        label="Categoria",
+    )
+    tag = forms.ModelChoiceField(
+        Tag.objects.only("pk", "name").order_by("name"),
+        required=False,
+        label="Tag",
+    )
+
+
+class PostAdminForm(forms.ModelForm):
+    """O content fica em PostBody; o form lê e grava por Post.content."""
+
+    content = forms.CharField()
+
+    class Meta:
+        model = Post
+        fields = "__all__"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        widget = SummernoteWidget if get_config()["iframe"] else SummernoteInplaceWidget
+        self.fields["content"].widget = widget()
+        if self.instance.pk:
+            self.initial.setdefault("content", self.instance.content)
+
+    def save(self, commit=True):
+        self.instance.content = self.cleaned_data["content"]
+        return super().save(commit)
+
+
 @admin.register(Post)
-class PostAdmin(SummernoteModelAdmin):
-    summernote_fields = ("content",)
+class PostAdmin(LowQueryChangeListMixin, RevisionMixin, admin.ModelAdmin):
+    form = PostAdminForm
+    fields = (
+        "title",
+        "slug",
+        "excerpt",
+        "is_published",
+        "site",
+        "content",
+        "cover",
+        "cover_in_post_content",
+        "category",
+        "tags",
+        "created_at",
+        "updated_at",
+        "created_by",
+        "updated_by",
+        "link",
+    )
     list_display = (
         "id",
         "title",
@@ -78,19 +294,27 @@ class PostAdmin(SummernoteModelAdmin):
         "created_by",
     )
     list_display_links = ("title",)
+    list_select_related = ("created_by",)
+    # title e excerpt têm índices trigram (migração 0007) no Postgres
     search_fields = (
-        "id",
-        "slug",
         "title",
         "excerpt",
-        "content",
     )
+    search_help_text = "Busca pelo título, resumo, slug exato ou id."
     list_per_page = 50
     list_filter = (
-        "category",
+        CategoryListFilter,
         "is_published",
+        "site",
+    )
+    action_form = PostActionForm
+    actions = (
+        "publish",
+        "unpublish",
+        "set_category",
+        "add_tag",
+        "remove_tag",
     )
-    list_editable = ("is_published",)
     ordering = ("-id",)
     readonly_fields = (
         "created_at",
@@ -107,6 +331,10 @@ class PostAdmin(SummernoteModelAdmin):
         "category",
     )
 
+    def get_changelist(self, request, **kwargs):
+        # Sem o content na linha do Post não há o que adiar
+        return ChangeList
+
     def link(self, obj):
         if not obj.pk:
             return "-"
@@ -122,4 +350,74 @@ class PostAdmin(SummernoteModelAdmin):
         else:
             obj.created_by = request.user  # type: ignore
 
-        obj.save()
+        super().save_model(request, obj, form, change)
+
+    def bulk_update(self, request, queryset, **fields):
+        """
+        Altera todos os posts selecionados com um único UPDATE, sem passar
+        pelo Post.save de cada um.
+        """
+        pks = list(queryset.values_list("pk", flat=True))
+        Post.objects.filter(pk__in=pks).update(
+            updated_by=request.user,
+            updated_at=timezone.now(),
+            **fields,
+        )
+        return pks
+
+    def notify_changed(self, request, pks, fields):
+        # Um único aviso para o lote inteiro
+        posts_changed.send(sender=Post, pks=pks, fields=fields)
+        self.message_user(request, f"{len(pks)} post(s) alterado(s).")
+
+    def get_action_choice(self, request, name):
+        try:
+            value = self.action_form.base_fields[name].clean(request.POST.get(name))
+        except ValidationError:
+            value = None
+        if value is None:
+            self.message_user(
+                request, "Escolha a opção no formulário de ação.", messages.ERROR
+            )
+        return value
+
+    @admin.action(description="Publicar posts selecionados")
+    def publish(self, request, queryset):
+        pks = self.bulk_update(request, queryset, is_published=True)
+        self.notify_changed(request, pks, ("is_published",))
+
+    @admin.action(description="Despublicar posts selecionados")
+    def unpublish(self, request, queryset):
+        pks = self.bulk_update(request, queryset, is_published=False)
+        self.notify_changed(request, pks, ("is_published",))
+
+    @admin.action(description="Mudar categoria dos posts selecionados")
+    def set_category(self, request, queryset):
+        category = self.get_action_choice(request, "category")
+        if category is None:
+            return
+        pks = self.bulk_update(request, queryset, category=category)
+        self.notify_changed(request, pks, ("category",))
+
+    @admin.action(description="Adicionar tag aos posts selecionados")
+    def add_tag(self, request, queryset):
+        tag = self.get_action_choice(request, "tag")
+        if tag is None:
+            return
+        pks = self.bulk_update(request, queryset)
+        Through = Post.tags.through
+        Through.objects.bulk_create(
+            [Through(post_id=pk, tag_id=tag.pk) for pk in pks],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+        self.notify_changed(request, pks, ("tags",))
+
+    @admin.action(description="Remover tag dos posts selecionados")
+    def remove_tag(self, request, queryset):
+        tag = self.get_action_choice(request, "tag")
+        if tag is None:
+            return
+        pks = self.bulk_update(request, queryset)
+        Post.tags.through.objects.filter(post_id__in=pks, tag=tag).delete()
+        self.notify_changed(request, pks, ("tags",))
@@ -0,0 +1,215 @@
+"""
+Versões async das páginas públicas só de leitura.
+
+Usadas quando BLOG_ASYNC_VIEWS=1 e o projeto roda sob ASGI
+(scripts/runserver.sh com ASGI=1): a espera pelo Postgres não prende uma
+thread por requisição. Só a renderização do template (que ainda é síncrona,
+inclusive os context processors) vai para uma thread com sync_to_async.
+"""
+import hashlib
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from blog.models import AuthorProfile, Page, Post, PostBody
+from blog.views import (
+    DETAIL_CACHE_MAX_AGE,
+    LIST_CACHE_MAX_AGE,
+    PER_PAGE,
+    CachePolicyMixin,
+    post_content_chunks,
+    post_surrogate_keys,
+    split_post_template,
+)
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models.query import QuerySet
+from django.db.models.query_utils import Q
+from django.http import Http404, HttpRequest, HttpResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.views import View
+
+COUNT_CACHE_TIMEOUT = 60
+
+arender = sync_to_async(render)
+asplit_post_template = sync_to_async(split_post_template)
+
+
+async def cached_count(queryset: QuerySet[Any]) -> int:
+    """COUNT(*) da listagem guardado no cache por alguns segundos."""
+    sql_hash = hashlib.md5(str(queryset.query).encode()).hexdigest()
+    key = f"blog:count:{sql_hash}"
+    count = await cache.aget(key)
+    if count is None:
+        count = await queryset.acount()
+        await cache.aset(key, count, COUNT_CACHE_TIMEOUT)
+    return count
+
+
+async def astream_post(head: str, post_pk: int, tail: str, using: str):
+    yield head
+    # Mesmo banco do post: o ReplicaMiddleware já terminou a essa altura
+    content = (
+        PostBody.objects.using(using)
+        .filter(pk=post_pk)
+        .values_list("content", flat=True)
+    )
+    for chunk in post_content_chunks(await content.afirst() or ""):
+        yield chunk
+    yield tail
+
+
+class AsyncPostListView(CachePolicyMixin, View):
+    template_name = "blog/pages/index.html"
+    paginate_by = PER_PAGE
+    cache_max_age = LIST_CACHE_MAX_AGE
+    cache_stale_while_revalidate = 60
+    show_most_read = True
+
+    def get_queryset(self) -> QuerySet[Any]:
+        site = self.request.site_setup
+        return Post.objects.get_published(site).order_by("-created_at")
+
+    def get_page_title(self) -> str:
+        return "Home - "
+
+    def get_surrogate_keys(self) -> list[str]:
+        posts = getattr(self, "_listed_posts", [])
+        return ["site", "post-list", *(f"post-{post.pk}" for post in posts)]
+
+    async def paginate(self, queryset: QuerySet[Any]):
+        paginator = Paginator(queryset, self.paginate_by)
+        # count é um cached_property: preenchido aqui, o Paginator não
+        # faz o COUNT(*) síncrono.
+        paginator.count = await cached_count(queryset)
+        page_number = self.request.GET.get("page") or 1
+        if page_number == "last":
+            page_number = paginator.num_pages
+        try:
+            page = paginator.page(page_number)
+        except InvalidPage:
+            raise Http404()
+        page.object_list = [post async for post in page.object_list]
+        return paginator, page
+
+    async def get_context_data(self) -> dict[str, Any]:
+        paginator, page = await self.paginate(self.get_queryset())
+        self._listed_posts = page.object_list
+        context = {
+            "paginator": paginator,
+            "page_obj": page,
+            "is_paginated": page.has_other_pages(),
+            "posts": page.object_list,
+            "page_title": self.get_page_title(),
+        }
+        if self.show_most_read:
+            context["most_read"] = await Post.objects.amost_read(
+                site=self.request.site_setup
+            )
+        return context
+
+    async def get(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        context = await self.get_context_data()
+        return await arender(request, self.template_name, context)
+
+
+class AsyncSearchListView(AsyncPostListView):
+    cache_max_age = 60
+    cache_stale_while_revalidate = 30
+    show_most_read = False
+
+    async def get(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        self._search_value = request.GET.get("search", "").strip()
+        if self._search_value == "":
+            return redirect("blog:index")
+        return await super().get(request, *args, **kwargs)
+
+    def get_queryset(self) -> QuerySet[Any]:
+        search_value = self._search_value
+        return (
+            super()
+            .get_queryset()
+            .filter(
+                Q(title__icontains=search_value)
+                | Q(body__content__icontains=search_value)
+                | Q(excerpt__icontains=search_value)
+            )
+        )
+
+    def get_page_title(self) -> str:
+        return f"{self._search_value[:15]} - Search - "
+
+    async def paginate(self, queryset: QuerySet[Any]):
+        # Como na versão síncrona: só os PER_PAGE primeiros resultados
+        posts = [post async for post in queryset[:PER_PAGE]]
+        paginator = Paginator(posts, self.paginate_by)
+        return paginator, paginator.page(1)
+
+    async def get_context_data(self) -> dict[str, Any]:
+        context = await super().get_context_data()
+        context["search_value"] = self._search_value
+        return context
+
+
+class AsyncPageDetailView(CachePolicyMixin, View):
+    template_name = "blog/pages/page.html"
+    cache_max_age = DETAIL_CACHE_MAX_AGE
+    cache_stale_while_revalidate = 60 * 60
+
+    def get_surrogate_keys(self) -> list[str]:
+        return ["site", f"page-{self.object.pk}"]
+
+    async def get(self, request: HttpRequest, slug: str) -> HttpResponse:
+        try:
+            page = await Page.objects.get_published(request.site_setup).aget(slug=slug)
+        except Page.DoesNotExist:
+            raise Http404()
+        self.object = page
+
+        context = {"page": page, "page_title": f"{page.title} - Página - "}
+        return await arender(request, self.template_name, context)
+
+
+class AsyncPostDetailView(CachePolicyMixin, View):
+    template_name = "blog/pages/post.html"
+    cache_max_age = DETAIL_CACHE_MAX_AGE
+    cache_stale_while_revalidate = 60 * 60
+
+    def get_surrogate_keys(self) -> list[str]:
+        return post_surrogate_keys(self.object)
+
+    async def get(self, request: HttpRequest, slug: str) -> HttpResponse:
+        queryset = (
+            Post.objects.get_published(request.site_setup)
+            .select_related("category")
+            .prefetch_related("tags")
+        )
+        if not settings.BLOG_STREAM_POSTS:
+            queryset = queryset.select_related("body")
+        try:
+            post = await queryset.aget(slug=slug)
+        except Post.DoesNotExist:
+            raise Http404()
+        self.object = post
+
+        author = None
+        if post.created_by_id:
+            author = await AuthorProfile.objects.acached(post.created_by_id)
+
+        context = {
+            "post": post,
+            "author": author,
+            "page_title": f"{post.title} - Post - ",
+        }
+        if settings.BLOG_STREAM_POSTS:
+            head, tail = await asplit_post_template(
+                request, self.template_name, context
+            )
+            return StreamingHttpResponse(
+                astream_post(head, post.pk, tail, post._state.db)
+            )
+        return await arender(request, self.template_name, context)
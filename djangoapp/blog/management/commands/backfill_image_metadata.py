@@ -0,0 +1,74 @@
+from blog.models import Post, PostAttachment
+from django.core.management.base import BaseCommand
+from utils.images import image_metadata
+
+METADATA_FIELDS = ("width", "height", "color", "placeholder")
+
+
+class Command(BaseCommand):
+    help = (
+        "Preenche largura, altura, cor dominante e placeholder das capas dos "
+        "posts e dos anexos que ainda não têm esses dados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Recalcula também as imagens que já têm os dados.",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        targets = (
+            (Post, "cover", "cover_"),
+            (PostAttachment, "file", ""),
+        )
+        # O storage guarda cada conteúdo uma vez só: o mesmo arquivo pode
+        # aparecer em várias linhas
+        by_name = {}
+
+        for model, field, prefix in targets:
+            queryset = model.objects.exclude(**{field: ""}).only("pk", field)
+            if not options["force"]:
+                queryset = queryset.filter(**{f"{prefix}width__isnull": True})
+
+            names = [f"{prefix}{name}" for name in METADATA_FIELDS]
+            updated = 0
+            failed = 0
+            batch = []
+            # Lista fechada antes dos UPDATEs: no SQLite o iterator() veria
+            # as próprias alterações
+            for obj in list(queryset):
+                image = getattr(obj, field)
+                if image.name not in by_name:
+                    try:
+                        by_name[image.name] = image_metadata(image)
+                    except (OSError, ValueError) as error:
+                        self.stderr.write(f"{image.name}: {error}")
+                        failed += 1
+                        continue
+
+                metadata = by_name[image.name]
+                for name in METADATA_FIELDS:
+                    setattr(obj, f"{prefix}{name}", metadata[name])
+                batch.append(obj)
+                if len(batch) >= options["batch_size"]:
+                    updated += self.save(model, batch, names, options["dry_run"])
+                    batch = []
+            if batch:
+                updated += self.save(model, batch, names, options["dry_run"])
+
+            action = "seriam atualizados" if options["dry_run"] else "atualizados"
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{model._meta.verbose_name_plural}: {updated} {action}, "
+                    f"{failed} com erro."
+                )
+            )
+
+    def save(self, model, batch, names, dry_run):
+        if not dry_run:
+            model.objects.bulk_update(batch, names)
+        return len(batch)
@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from blog.models import MediaBlob, Post
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga os arquivos de mídia (capas e anexos) que não são mais "
+        "referenciados por nenhum Post ou PostAttachment."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=int,
+            default=24,
+            help="Só apaga arquivos liberados há mais tempo que isso.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        storage = Post._meta.get_field("cover").storage
+        limit = timezone.now() - timedelta(hours=options["grace_hours"])
+        orphans = MediaBlob.objects.filter(ref_count__lte=0).exclude(
+            released_at__gt=limit
+        )
+
+        deleted = 0
+        for blob in orphans.iterator(chunk_size=options["batch_size"]):
+            if options["dry_run"]:
+                self.stdout.write(blob.name)
+                deleted += 1
+                continue
+
+            # Confere de novo: um upload pode ter reaproveitado o arquivo
+            removed, _ = MediaBlob.objects.filter(
+                pk=blob.pk, ref_count__lte=0
+            ).delete()
+            if removed:
+                storage.delete(blob.name)
+                deleted += 1
+
+        action = "Seriam apagados" if options["dry_run"] else "Apagados"
+        self.stdout.write(self.style.SUCCESS(f"{action} {deleted} arquivo(s)."))
@@ -0,0 +1,151 @@
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from urllib.parse import unquote
+
+from blog.models import (
+    AuthorProfile,
+    MediaBlob,
+    Page,
+    Post,
+    PostAttachment,
+    PostBody,
+)
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from site_setup.models import SiteSetup
+
+
+def scan_files(root, skip=None):
+    """Percorre root com os.scandir, devolvendo (caminho relativo, stat)."""
+    stack = [Path(root)]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if skip is None or Path(entry.path) != skip:
+                        stack.append(Path(entry.path))
+                elif entry.is_file(follow_symlinks=False):
+                    relative = Path(entry.path).relative_to(root).as_posix()
+                    yield relative, entry.stat(follow_symlinks=False)
+
+
+class Command(BaseCommand):
+    help = (
+        "Procura em MEDIA_ROOT arquivos que não são usados por nenhum Post, "
+        "Page, PostAttachment, AuthorProfile ou SiteSetup (favicon e ícones) e "
+        "os apaga (ou move para uma quarentena)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--quarantine",
+            help="Move os órfãos para esse diretório em vez de apagar.",
+        )
+        parser.add_argument(
+            "--min-age-hours",
+            type=int,
+            default=24,
+            help="Ignora arquivos modificados há menos tempo (uploads em curso).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Arquivos conferidos contra o banco de cada vez.",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def referenced(self, names, icons_dirs, chunk_size):
+        """Quais nomes de um lote de arquivos ainda estão em uso."""
+        names = set(names)
+        used = set()
+        fields = (
+            (Post.objects, "cover"),
+            (PostAttachment.objects, "file"),
+            (AuthorProfile.objects, "avatar"),
+            (SiteSetup.objects, "favicon"),
+        )
+        for manager, field in fields:
+            values = manager.filter(**{f"{field}__in": names})
+            used.update(values.values_list(field, flat=True))
+
+        # Os ícones gerados do favicon (utils/icons.py) não ficam num campo
+        used.update(name for name in names if name.rpartition("/")[0] in icons_dirs)
+
+        for manager in (PostBody.objects, Page.objects):
+            contents = manager.filter(content__contains=settings.MEDIA_URL)
+            for content in contents.values_list("content", flat=True).iterator(
+                chunk_size
+            ):
+                for url in self.url_re.findall(content):
+                    if unquote(url) in names:
+                        used.add(unquote(url))
+        return used
+
+    def prune(self, chunk, icons_dirs, root, quarantine, options):
+        """Remove os órfãos de um lote; retorna (quantos, bytes)."""
+        names = [name for name, _ in chunk]
+        used = self.referenced(names, icons_dirs, options["chunk_size"])
+        orphans = 0
+        freed = 0
+        for name, size in chunk:
+            if name in used:
+                continue
+
+            orphans += 1
+            freed += size
+            if options["dry_run"]:
+                self.stdout.write(name)
+                continue
+
+            if quarantine:
+                target = quarantine / name
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(root / name, target)
+            else:
+                (root / name).unlink(missing_ok=True)
+            MediaBlob.objects.filter(name=name).delete()
+        return orphans, freed
+
+    def handle(self, *args, **options):
+        root = Path(settings.MEDIA_ROOT)
+        quarantine = options["quarantine"] and Path(options["quarantine"]).resolve()
+        newer_than = time.time() - options["min_age_hours"] * 60 * 60
+        self.url_re = re.compile(
+            re.escape(settings.MEDIA_URL) + r"""([^"'\s<>()?#]+)"""
+        )
+        # Um diretório por SiteSetup
+        icons_dirs = set(
+            SiteSetup.objects.exclude(icons_dir="").values_list("icons_dir", flat=True)
+        )
+
+        # Os arquivos são conferidos em lotes de --chunk-size contra o banco:
+        # a memória não cresce com o tamanho de MEDIA_ROOT
+        orphans = 0
+        freed = 0
+        chunk = []
+        for name, stat in scan_files(root, skip=quarantine):
+            if stat.st_mtime > newer_than:
+                continue
+            chunk.append((name, stat.st_size))
+            if len(chunk) >= options["chunk_size"]:
+                found, size = self.prune(chunk, icons_dirs, root, quarantine, options)
+                orphans += found
+                freed += size
+                chunk = []
+        if chunk:
+            found, size = self.prune(chunk, icons_dirs, root, quarantine, options)
+            orphans += found
+            freed += size
+
+        action = "encontrados" if options["dry_run"] else "removidos"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{orphans} arquivo(s) órfão(s) {action} "
+                f"({freed / 1024 / 1024:.1f} MB)."
+            )
+        )
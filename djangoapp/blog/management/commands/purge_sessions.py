@@ -0,0 +1,57 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+DB_ENGINES = (
+    "django.contrib.sessions.backends.db",
+    "django.contrib.sessions.backends.cached_db",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga as sessões expiradas do banco em lotes pequenos, sem segurar "
+        "a tabela django_session por muito tempo (o clearsessions apaga tudo "
+        "num único DELETE)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.1,
+            help="Pausa em segundos entre os lotes.",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE not in DB_ENGINES:
+            self.stdout.write(
+                f"{settings.SESSION_ENGINE} não guarda sessões no banco; "
+                "nada a fazer."
+            )
+            return
+
+        expired = Session.objects.filter(expire_date__lt=timezone.now())
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.SUCCESS(f"Seriam apagadas {expired.count()} sessão(ões).")
+            )
+            return
+
+        deleted = 0
+        while True:
+            keys = list(
+                expired.values_list("pk", flat=True)[: options["batch_size"]]
+            )
+            if not keys:
+                break
+            removed, _ = Session.objects.filter(pk__in=keys).delete()
+            deleted += removed
+            time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Apagadas {deleted} sessão(ões)."))
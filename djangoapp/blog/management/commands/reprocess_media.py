@@ -0,0 +1,204 @@
+import hashlib
+import os
+import signal
+import time
+from multiprocessing import Pool
+from pathlib import Path, PurePosixPath
+
+from blog.models import AuthorProfile, Page, Post, PostAttachment, PostBody
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from site_setup.models import SiteSetup
+from utils.images import IMAGE_PROFILES, reencode_image
+from utils.storages import ContentAddressedStorage
+
+# perfil: (model, campo)
+SOURCES = {
+    "cover": (Post, "cover"),
+    "attachment": (PostAttachment, "file"),
+    "avatar": (AuthorProfile, "avatar"),
+    "favicon": (SiteSetup, "favicon"),
+}
+
+
+class FileTimeout(Exception):
+    pass
+
+
+def on_alarm(signum, frame):
+    raise FileTimeout()
+
+
+def save_copy(name, profile, data):
+    """
+    Grava o conteúdo novo com outro nome, derivado do hash. O arquivo
+    antigo nunca é sobrescrito: ele pode estar no cache "immutable" de
+    navegadores e CDNs (MEDIA_IMMUTABLE_PREFIXES).
+    """
+    if profile == "favicon":
+        # O favicon não usa o ContentAddressedStorage: fica no mesmo diretório
+        path = PurePosixPath(name)
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        new_name = str(path.with_name(f"{digest}{path.suffix.lower()}"))
+        return default_storage.save(new_name, ContentFile(data))
+    return ContentAddressedStorage().save(name, ContentFile(data))
+
+
+def reprocess(task):
+    """Roda no processo do pool: nada de banco aqui, só o arquivo."""
+    name, path, profile, timeout, dry_run = task
+    signal.signal(signal.SIGALRM, on_alarm)
+    signal.alarm(timeout)
+    try:
+        before, data, _, _ = reencode_image(path, **IMAGE_PROFILES[profile])
+        new_name = None
+        if data is not None and not dry_run:
+            new_name = save_copy(name, profile, data)
+    except FileTimeout:
+        return name, profile, "timeout", 0, 0, None
+    except (OSError, ValueError) as error:
+        return name, profile, f"erro: {error}", 0, 0, None
+    finally:
+        signal.alarm(0)
+    after = before if data is None else len(data)
+    return name, profile, "ok", before, after, new_name
+
+
+class Command(BaseCommand):
+    help = (
+        "Reprocessa (redimensiona e recodifica) as imagens já enviadas com os "
+        "parâmetros atuais de utils.images.IMAGE_PROFILES: capas, anexos, "
+        "avatares e favicon. Quando o resultado fica menor ele é gravado com "
+        "um nome novo e os registros passam a usá-lo; o arquivo antigo fica "
+        "para o collect_media_blobs e o prune_orphan_media."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            "--timeout",
+            type=int,
+            default=60,
+            help="Segundos por arquivo antes de desistir dele.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=str(settings.DATA_DIR / "reprocess_media.checkpoint"),
+            help="Arquivo com os nomes já processados, para retomar depois.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignora o checkpoint e processa tudo de novo.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Só estima quanto seria economizado; não grava nada.",
+        )
+
+    def media_names(self):
+        """(nome, perfil) de cada arquivo, sem repetir nomes."""
+        seen = set()
+        for profile, (model, field) in SOURCES.items():
+            names = (
+                model.objects.exclude(**{field: ""})
+                .exclude(**{f"{field}__isnull": True})
+                .values_list(field, flat=True)
+                .distinct()
+            )
+            for name in names.iterator(chunk_size=2000):
+                if name not in seen:
+                    seen.add(name)
+                    yield name, profile
+
+    def replace_references(self, name, new_name, profile):
+        """
+        Troca o arquivo pelo save() de cada model: contagem do MediaBlob,
+        metadados da imagem, ícones do favicon e purge do cache vêm junto.
+        """
+        model, field = SOURCES[profile]
+        with transaction.atomic():
+            for obj in model.objects.filter(**{field: name}):
+                setattr(obj, field, new_name)
+                obj.save()
+
+            if profile == "attachment":
+                # Os anexos aparecem no HTML do content pela URL
+                storage = PostAttachment._meta.get_field("file").storage
+                old_url, new_url = storage.url(name), storage.url(new_name)
+                bodies = PostBody.objects.filter(content__contains=old_url)
+                for body in bodies.select_related("post"):
+                    body.post.content = body.content.replace(old_url, new_url)
+                    body.post.save()
+                for page in Page.objects.filter(content__contains=old_url):
+                    page.content = page.content.replace(old_url, new_url)
+                    page.save()
+
+    def handle(self, *args, **options):
+        checkpoint = Path(options["checkpoint"])
+        dry_run = options["dry_run"]
+        done = set()
+        if checkpoint.exists() and not options["restart"] and not dry_run:
+            done = set(checkpoint.read_text().splitlines())
+
+        root = Path(settings.MEDIA_ROOT)
+        tasks = [
+            (name, str(root / name), profile, options["timeout"], dry_run)
+            for name, profile in self.media_names()
+            if name not in done
+        ]
+        self.stdout.write(
+            f"{len(tasks)} arquivo(s) a processar ({len(done)} já no checkpoint)."
+        )
+
+        processed = 0
+        saved = 0
+        failed = 0
+        start = time.perf_counter()
+
+        log = None
+        if not dry_run:
+            checkpoint.parent.mkdir(parents=True, exist_ok=True)
+            log = checkpoint.open("w" if options["restart"] else "a")
+
+        # Os processos do pool não usam o banco; não herdam a conexão aberta
+        connections.close_all()
+        try:
+            with Pool(options["workers"]) as pool:
+                results = pool.imap_unordered(reprocess, tasks)
+                for name, profile, status, before, after, new_name in results:
+                    if status != "ok":
+                        failed += 1
+                        self.stderr.write(f"{name}: {status}")
+                        continue
+
+                    done_names = [name]
+                    if new_name and new_name != name:
+                        self.replace_references(name, new_name, profile)
+                        # Recodificar o arquivo novo de novo só perderia qualidade
+                        done_names.append(new_name)
+                    processed += 1
+                    saved += before - after
+                    if log:
+                        # Um nome por linha, gravado na hora: um Ctrl+C
+                        # não perde o que já foi feito
+                        log.writelines(f"{done}\n" for done in done_names)
+                        log.flush()
+        finally:
+            if log:
+                log.close()
+
+        elapsed = time.perf_counter() - start
+        action = "Economia estimada" if dry_run else "Economizados"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{processed} imagem(ns) em {elapsed:.1f}s "
+                f"({processed / elapsed if elapsed else 0:.1f} imagens/s), "
+                f"{failed} com erro ou timeout. "
+                f"{action}: {saved / 1024 / 1024:.2f} MB."
+            )
+        )
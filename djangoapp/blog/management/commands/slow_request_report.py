@@ -0,0 +1,132 @@
+import json
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+SQL_LISTS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+
+
+def normalize_sql(sql):
+    """A mesma consulta com valores diferentes vira uma linha só."""
+    sql = SQL_LITERALS.sub("?", sql.replace("%s", "?"))
+    return " ".join(SQL_LISTS.sub("(...)", sql).split())
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Resume o log de requisições lentas (utils/slow_requests.py): as "
+        "views que mais somam tempo, as consultas SQL mais caras e, quando "
+        "houver perfis, as funções mais pesadas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--log", default=settings.SLOW_REQUEST_LOG)
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument(
+            "--hours",
+            type=float,
+            default=0,
+            help="Só as requisições das últimas N horas (0 = todas).",
+        )
+        parser.add_argument(
+            "--by",
+            choices=("view", "path"),
+            default="view",
+            help="Agrupa as requisições pela view ou pelo caminho.",
+        )
+
+    def records(self, log, since):
+        """O arquivo atual e os já girados (.1, .2, ...), do mais antigo."""
+        path = Path(log)
+        files = sorted(
+            path.parent.glob(f"{path.name}.*"),
+            key=lambda file: int(file.suffix[1:]) if file.suffix[1:].isdigit() else 0,
+            reverse=True,
+        )
+        for file in [*files, path]:
+            if not file.exists():
+                continue
+            with file.open(encoding="utf-8") as lines:
+                for line in lines:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Linha cortada numa rotação
+                        continue
+                    if since and datetime.fromisoformat(record["time"]) < since:
+                        continue
+                    yield record
+
+    def handle(self, *args, **options):
+        since = None
+        if options["hours"]:
+            since = datetime.now(timezone.utc) - timedelta(hours=options["hours"])
+
+        requests = defaultdict(list)
+        queries = defaultdict(lambda: [0, 0.0])
+        functions = defaultdict(float)
+        total = 0
+
+        for record in self.records(options["log"], since):
+            total += 1
+            key = record.get(options["by"]) or record["path"]
+            requests[key].append(record)
+            for query in record.get("sql", ()):
+                stats = queries[normalize_sql(query["sql"])]
+                stats[0] += 1
+                stats[1] += query["ms"]
+            for function, _, tottime, _ in record.get("profile", ()):
+                functions[function] += tottime
+
+        if not total:
+            self.stdout.write("Nenhuma requisição lenta no log.")
+            return
+
+        top = options["top"]
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{total} requisição(ões) lenta(s)"))
+        self.stdout.write(
+            f"{'total ms':>10} {'n':>5} {'p50':>8} {'p95':>8} {'max':>8} "
+            f"{'sql/req':>7} {'sql ms':>8}  {options['by']}"
+        )
+        ranking = sorted(
+            requests.items(),
+            key=lambda item: sum(record["ms"] for record in item[1]),
+            reverse=True,
+        )
+        for key, records in ranking[:top]:
+            times = [record["ms"] for record in records]
+            sampled = [record for record in records if "sql_count" in record]
+            sql_count = sql_ms = 0
+            if sampled:
+                sql_count = sum(record["sql_count"] for record in sampled) / len(sampled)
+                sql_ms = sum(record["sql_ms"] for record in sampled) / len(sampled)
+            self.stdout.write(
+                f"{sum(times):10.0f} {len(times):5} {percentile(times, 0.5):8.0f} "
+                f"{percentile(times, 0.95):8.0f} {max(times):8.0f} "
+                f"{sql_count:7.1f} {sql_ms:8.1f}  {key}"
+            )
+
+        if queries:
+            self.stdout.write(self.style.MIGRATE_HEADING("\nConsultas SQL mais caras"))
+            self.stdout.write(f"{'total ms':>10} {'n':>6} {'média':>8}  sql")
+            ranking = sorted(queries.items(), key=lambda item: item[1][1], reverse=True)
+            for sql, (count, ms) in ranking[:top]:
+                self.stdout.write(f"{ms:10.1f} {count:6} {ms / count:8.2f}  {sql[:200]}")
+
+        if functions:
+            self.stdout.write(
+                self.style.MIGRATE_HEADING("\nFunções com mais tempo próprio (cProfile)")
+            )
+            ranking = sorted(functions.items(), key=lambda item: item[1], reverse=True)
+            for function, ms in ranking[:top]:
+                self.stdout.write(f"{ms:10.1f}  {function}")
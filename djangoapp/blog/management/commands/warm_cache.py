@@ -0,0 +1,115 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from blog.models import ArchiveMonth, AuthorProfile, Category, Page, Post, Tag
+from blog.views import PER_PAGE
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+from site_setup.sites import get_host_map, site_for_host
+
+
+class Command(BaseCommand):
+    help = (
+        "Renderiza as páginas públicas mais acessadas (índice, posts recentes, "
+        "categorias, tags, autores e páginas) para aquecer o cache depois de "
+        "um deploy. Só adianta com um cache compartilhado (CACHE_BACKEND), "
+        "não com o locmem de cada processo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--index-pages", type=int, default=3, help="Páginas do índice."
+        )
+        parser.add_argument("--posts", type=int, default=50, help="Posts recentes.")
+        parser.add_argument(
+            "--authors", type=int, default=10, help="Autores com mais posts."
+        )
+        parser.add_argument(
+            "--archive-months", type=int, default=12, help="Meses mais recentes."
+        )
+        parser.add_argument("--host", help="Host das requisições (ALLOWED_HOSTS).")
+        parser.add_argument(
+            "--slowest", type=int, default=10, help="Quantas URLs lentas listar."
+        )
+
+    def get_urls(self, options, site):
+        """URLs em ordem de prioridade: o que é mais visto vem primeiro."""
+        posts = Post.objects.get_published(site).order_by("-created_at")
+        index = reverse("blog:index")
+        yield index
+        last_page = min(options["index_pages"], math.ceil(posts.count() / PER_PAGE))
+        for page in range(2, last_page + 1):
+            yield f"{index}?page={page}"
+
+        for slug in posts.values_list("slug", flat=True)[: options["posts"]]:
+            yield reverse("blog:post", args=(slug,))
+
+        # Sem posts publicados as listagens dão 404
+        for model, name in ((Category, "blog:category"), (Tag, "blog:tag")):
+            used = model.objects.filter(post__is_published=True).distinct()
+            for slug in used.order_by("name").values_list("slug", flat=True):
+                yield reverse(name, args=(slug,))
+
+        authors = AuthorProfile.objects.filter(post_count__gt=0).order_by(
+            "-post_count"
+        )
+        for pk in authors.values_list("pk", flat=True)[: options["authors"]]:
+            yield reverse("blog:created_by", args=(pk,))
+
+        yield reverse("blog:archive")
+        for year, month in ArchiveMonth.objects.for_site(site).values_list(
+            "year", "month"
+        )[: options["archive_months"]]:
+            yield reverse("blog:archive_month", args=(year, month))
+
+        pages = Page.objects.get_published(site).order_by("pk")
+        for slug in pages.values_list("slug", flat=True):
+            yield reverse("blog:page", args=(slug,))
+
+    def get_host(self, options):
+        if options["host"]:
+            return options["host"]
+        hosts = [host for host in settings.ALLOWED_HOSTS if "*" not in host]
+        return hosts[0].lstrip(".") if hosts else "localhost"
+
+    def handle(self, *args, **options):
+        host = self.get_host(options)
+        # Só as URLs do site que atende esse host
+        site = site_for_host(get_host_map(), host)
+        urls = list(dict.fromkeys(self.get_urls(options, site)))
+        local = threading.local()
+
+        def render(url):
+            # O Client não é thread-safe: um por thread
+            if not hasattr(local, "client"):
+                local.client = Client(HTTP_HOST=host, raise_request_exception=False)
+            start = time.perf_counter()
+            response = local.client.get(url)
+            return url, response.status_code, time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            results = list(executor.map(render, urls))
+        elapsed = time.perf_counter() - start
+
+        errors = [url for url, status, _ in results if status != 200]
+        for url in errors:
+            self.stderr.write(f"Falhou: {url}")
+
+        results.sort(key=lambda result: result[2], reverse=True)
+        if options["verbosity"] < 2:
+            results = results[: options["slowest"]]
+        for url, status, duration in results:
+            self.stdout.write(f"{duration * 1000:8.1f} ms  {status}  {url}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(urls)} URL(s) aquecidas em {elapsed:.2f}s "
+                f"com {options['workers']} worker(s), {len(errors)} erro(s)."
+            )
+        )
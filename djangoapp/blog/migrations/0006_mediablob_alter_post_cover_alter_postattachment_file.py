@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:07
+
+from collections import Counter
+
+from django.db import migrations, models
+import django_summernote.utils
+import utils.storages
+
+
+def count_references(apps, schema_editor):
+    MediaBlob = apps.get_model("blog", "MediaBlob")
+    Post = apps.get_model("blog", "Post")
+    PostAttachment = apps.get_model("blog", "PostAttachment")
+
+    counts = Counter()
+    for queryset, field in ((Post.objects, "cover"), (PostAttachment.objects, "file")):
+        names = queryset.exclude(**{field: ""}).values_list(field, flat=True)
+        counts.update(names.iterator(chunk_size=2000))
+
+    MediaBlob.objects.bulk_create(
+        [MediaBlob(name=name, ref_count=count) for name, count in counts.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_postattachment_alter_post_category_alter_post_cover_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('released_at', models.DateTimeField(blank=True, default=None, null=True)),
+            ],
+            options={
+                'verbose_name': 'Media blob',
+                'verbose_name_plural': 'Media blobs',
+            },
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='cover',
+            field=models.ImageField(blank=True, default='', storage=utils.storages.ContentAddressedStorage(), upload_to='posts/%Y/%m/'),
+        ),
+        migrations.AlterField(
+            model_name='postattachment',
+            name='file',
+            field=models.FileField(storage=utils.storages.ContentAddressedStorage(), upload_to=django_summernote.utils.uploaded_filepath),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
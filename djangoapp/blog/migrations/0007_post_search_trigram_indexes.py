@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# Índices GIN com pg_trgm para os icontains da busca do admin
+# (UPPER(col::text) LIKE UPPER('%termo%')). Só existem no Postgres; em
+# outros bancos a migração não faz nada.
+INDEXES = {
+    "blog_post_title_trgm": "title",
+    "blog_post_excerpt_trgm": "excerpt",
+}
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON blog_post "
+            f"USING gin (UPPER({column}::text) gin_trgm_ops)"
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0006_mediablob_alter_post_cover_alter_postattachment_file"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
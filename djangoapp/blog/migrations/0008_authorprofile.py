@@ -0,0 +1,60 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:15
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import utils.storages
+
+
+def create_profiles(apps, schema_editor):
+    AuthorProfile = apps.get_model("blog", "AuthorProfile")
+    Post = apps.get_model("blog", "Post")
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+
+    counts = dict(
+        Post.objects.filter(is_published=True, created_by__isnull=False)
+        .values("created_by")
+        .annotate(total=models.Count("pk"))
+        .values_list("created_by", "total")
+    )
+    profiles = (
+        AuthorProfile(
+            user_id=user.pk,
+            display_name=(
+                f"{user.first_name} {user.last_name}"
+                if user.first_name
+                else user.username
+            ),
+            post_count=counts.get(user.pk, 0),
+        )
+        for user in User.objects.only(
+            "pk", "username", "first_name", "last_name"
+        ).iterator(chunk_size=2000)
+    )
+    AuthorProfile.objects.bulk_create(profiles, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('blog', '0007_post_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorProfile',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='author_profile', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('display_name', models.CharField(max_length=255)),
+                ('post_count', models.PositiveIntegerField(default=0)),
+                ('avatar', models.ImageField(blank=True, default='', storage=utils.storages.ContentAddressedStorage(), upload_to='authors/%Y/%m/')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Author profile',
+                'verbose_name_plural': 'Author profiles',
+            },
+        ),
+        migrations.RunPython(create_profiles, migrations.RunPython.noop),
+    ]
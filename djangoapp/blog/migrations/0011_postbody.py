@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_bodies(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    PostBody = apps.get_model("blog", "PostBody")
+    bodies = (
+        PostBody(post_id=pk, content=content)
+        for pk, content in Post.objects.values_list("pk", "content").iterator(
+            chunk_size=2000
+        )
+    )
+    PostBody.objects.bulk_create(bodies, batch_size=500)
+
+
+def copy_bodies_back(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    PostBody = apps.get_model("blog", "PostBody")
+    posts = [
+        Post(pk=post_id, content=content)
+        for post_id, content in PostBody.objects.values_list("post_id", "content")
+    ]
+    Post.objects.bulk_update(posts, ["content"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_revision'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostBody',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='body', serialize=False, to='blog.post')),
+                ('content', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'verbose_name': 'Post body',
+                'verbose_name_plural': 'Post bodies',
+            },
+        ),
+        migrations.RunPython(copy_bodies, copy_bodies_back),
+        # Com default a coluna pode voltar numa tabela já com linhas
+        migrations.AlterField(
+            model_name='post',
+            name='content',
+            field=models.TextField(default=''),
+        ),
+        migrations.RemoveField(
+            model_name='post',
+            name='content',
+        ),
+    ]
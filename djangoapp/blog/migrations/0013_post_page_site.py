@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('site_setup', '0008_sitesetup_hostnames'),
+        ('blog', '0012_image_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='site',
+            field=models.ForeignKey(blank=True, default=None, help_text='Vazio publica em todos os sites.', null=True, on_delete=django.db.models.deletion.PROTECT, to='site_setup.sitesetup'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='site',
+            field=models.ForeignKey(blank=True, default=None, help_text='Vazio publica em todos os sites.', null=True, on_delete=django.db.models.deletion.PROTECT, to='site_setup.sitesetup'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:55
+
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def fill_archive(apps, schema_editor):
+    ArchiveMonth = apps.get_model("blog", "ArchiveMonth")
+    Post = apps.get_model("blog", "Post")
+
+    rows = (
+        Post.objects.filter(is_published=True)
+        .annotate(archive_month=TruncMonth("created_at"))
+        .values("site", "archive_month")
+        .annotate(
+            total=models.Count("pk"),
+            first=models.Min("pk"),
+            last=models.Max("pk"),
+        )
+        .order_by()
+    )
+    ArchiveMonth.objects.bulk_create(
+        (
+            ArchiveMonth(
+                site_id=row["site"],
+                year=timezone.localtime(row["archive_month"]).year,
+                month=timezone.localtime(row["archive_month"]).month,
+                count=row["total"],
+                first_id=row["first"],
+                last_id=row["last"],
+            )
+            for row in rows
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('site_setup', '0008_sitesetup_hostnames'),
+        ('blog', '0013_post_page_site'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('first_id', models.PositiveBigIntegerField()),
+                ('last_id', models.PositiveBigIntegerField()),
+            ],
+            options={
+                'verbose_name': 'Archive month',
+                'verbose_name_plural': 'Archive months',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['created_at'], name='blog_post_created_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivemonth',
+            name='site',
+            field=models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.CASCADE, to='site_setup.sitesetup'),
+        ),
+        migrations.AddConstraint(
+            model_name='archivemonth',
+            constraint=models.UniqueConstraint(condition=models.Q(('site__isnull', False)), fields=('site', 'year', 'month'), name='blog_archivemonth_unique_site_month'),
+        ),
+        migrations.AddConstraint(
+            model_name='archivemonth',
+            constraint=models.UniqueConstraint(condition=models.Q(('site__isnull', True)), fields=('year', 'month'), name='blog_archivemonth_unique_month'),
+        ),
+        migrations.RunPython(fill_archive, migrations.RunPython.noop),
+    ]
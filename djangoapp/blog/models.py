@@ -1,29 +1,168 @@
+import re
+from datetime import datetime
+from urllib.parse import unquote
+
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.db import models
+from django.db.models import Count, F, Max, Min, Q, Sum
 from django.urls import reverse
+from django.utils import timezone
 from django_summernote.models import AbstractAttachment
-from utils.images import resize_image
+from utils.deltas import apply_tokens, make_delta, pack, tokenize, unpack
+from utils.images import IMAGE_PROFILES, image_metadata, resize_image
 from utils.rands import slugify_new
+from utils.storages import ContentAddressedStorage
+
+
+class MediaBlobManager(models.Manager):
+    def retain(self, name):
+        """Soma uma referência ao arquivo. Retorna True se ele é novo."""
+        blob, created = self.get_or_create(name=name, defaults={"ref_count": 1})
+        if not created:
+            self.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
+        return created
+
+    def release(self, name):
+        if not name:
+            return
+        self.filter(name=name).update(
+            ref_count=F("ref_count") - 1, released_at=timezone.now()
+        )
+
+    def swap(self, previous_name, name):
+        """
+        Move a referência de previous_name para name. Retorna True quando
+        name acabou de ser gravado e ainda precisa ser processado.
+        """
+        if previous_name == name:
+            return False
+        self.release(previous_name)
+        if not name:
+            return False
+        return self.retain(name)
+
+
+class MediaBlob(models.Model):
+    """
+    Contagem de referências dos arquivos salvos pelo
+    ContentAddressedStorage (Post.cover, PostAttachment.file e
+    AuthorProfile.avatar). Arquivos com
+    ref_count zerado são apagados pelo comando collect_media_blobs.
+    """
+
+    class Meta:
+        verbose_name = "Media blob"
+        verbose_name_plural = "Media blobs"
+
+    objects = MediaBlobManager()
+
+    name = models.CharField(max_length=255, unique=True)
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    released_at = models.DateTimeField(null=True, blank=True, default=None)
+
+    def __str__(self):
+        return str(self.name)
+
+
+def image_fields(image, prefix=""):
+    """Metadados de image (utils.images.image_metadata) como campos do model."""
+    if image:
+        metadata = image_metadata(image)
+    else:
+        metadata = {"width": None, "height": None, "color": "", "placeholder": ""}
+    return {f"{prefix}{name}": value for name, value in metadata.items()}
 
 
 class PostAttachment(AbstractAttachment):
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    color = models.CharField(max_length=7, blank=True, default="", editable=False)
+    placeholder = models.TextField(blank=True, default="", editable=False)
+
     def save(self, *args, **kwargs):
         if not self.name:
             self.name = self.file.name
 
-        current_file_name = str(self.file.name)
+        previous_file_name = ""
+        if self.pk:
+            previous_file_name = (
+                PostAttachment.objects.filter(pk=self.pk)
+                .values_list("file", flat=True)
+                .first()
+            ) or ""
+
         super_save = super().save(*args, **kwargs)
-        file_changed = False
 
-        if self.file:
-            file_changed = current_file_name != self.file.name
+        # Só redimensiona quando o conteúdo ainda não existia no storage
+        if MediaBlob.objects.swap(previous_file_name, self.file.name):
+            resize_image(self.file, **IMAGE_PROFILES["attachment"])
 
-        if file_changed:
-            resize_image(self.file, 900, True, 70)
+        if previous_file_name != self.file.name:
+            fields = image_fields(self.file)
+            PostAttachment.objects.filter(pk=self.pk).update(**fields)
+            self.__dict__.update(fields)
 
         return super_save
 
 
+IMG_TAG = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+IMG_SRC = re.compile(r"""\ssrc\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+IMG_SIZE = re.compile(r"\s(?:width|height)\s*=", re.IGNORECASE)
+
+
+def add_to_attribute(tag, name, value):
+    """Acrescenta value ao começo do atributo, criando-o se não existir."""
+    attribute = re.compile(rf"""(\s{name}\s*=\s*["'])""", re.IGNORECASE)
+    if attribute.search(tag):
+        return attribute.sub(lambda match: f"{match[1]}{value} ", tag, count=1)
+    return f'<img {name}="{value}"{tag[4:]}'
+
+
+def size_attachment_images(content):
+    """
+    Grava largura, altura e o placeholder dos anexos nas tags <img> do
+    conteúdo, para o navegador reservar o espaço antes de a imagem carregar.
+    """
+    sources = {}
+    for tag in IMG_TAG.findall(content or ""):
+        src = IMG_SRC.search(tag)
+        if src and not IMG_SIZE.search(tag) and src[1].startswith(settings.MEDIA_URL):
+            sources[src[1]] = unquote(src[1][len(settings.MEDIA_URL) :])
+    if not sources:
+        return content
+
+    attachments = {
+        attachment.file.name: attachment
+        for attachment in PostAttachment.objects.filter(
+            file__in=sources.values(), width__isnull=False
+        )
+    }
+
+    def size(match):
+        tag = match[0]
+        src = IMG_SRC.search(tag)
+        attachment = src and attachments.get(sources.get(src[1]))
+        if attachment is None or IMG_SIZE.search(tag):
+            return tag
+        tag = f'<img width="{attachment.width}" height="{attachment.height}"{tag[4:]}'
+        if attachment.placeholder:
+            tag = add_to_attribute(tag, "class", "image-placeholder")
+            tag = add_to_attribute(
+                tag,
+                "style",
+                f"background-color: {attachment.color}; "
+                f"background-image: url('{attachment.placeholder}');",
+            )
+        return tag
+
+    return IMG_TAG.sub(size, content)
+
+
 class Tag(models.Model):
     class Meta:
         verbose_name = "Tag"
@@ -70,7 +209,22 @@ class Category(models.Model):
         return str(self.name)
 
 
+def site_filter(site):
+    """Do site informado ou sem site (publicado em todos)."""
+    return Q(site__isnull=True) | Q(site=site)
+
+
+class PageManager(models.Manager):
+    def get_published(self, site=None):
+        queryset = self.filter(is_published=True)
+        if site is not None:
+            queryset = queryset.filter(site_filter(site))
+        return queryset
+
+
 class Page(models.Model):
+    objects = PageManager()
+
     title = models.CharField(
         max_length=65,
     )
@@ -84,7 +238,16 @@ class Page(models.Model):
             "para a página ser exibida publicamente."
         ),
     )
+    site = models.ForeignKey(
+        "site_setup.SiteSetup",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        default=None,
+        help_text="Vazio publica em todos os sites.",
+    )
     content = models.TextField()
+    revisions = GenericRelation("Revision")
 
     def get_absolute_url(self):
         if not self.is_published:
@@ -94,21 +257,57 @@ class Page(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify_new(self.title, 4)
+        self.content = size_attachment_images(self.content)
         return super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return str(self.title)
 
 
+MOST_READ_CACHE_TIMEOUT = 60 * 5
+
+
 class PostManager(models.Manager):
-    def get_published(self):
-        return self.filter(is_published=True).order_by("-pk")
+    def get_published(self, site=None):
+        queryset = self.filter(is_published=True)
+        if site is not None:
+            queryset = queryset.filter(site_filter(site))
+        return queryset.order_by("-pk")
+
+    def most_read_queryset(self, limit, site=None):
+        return (
+            self.get_published(site)
+            .filter(views__gt=0)
+            .order_by("-views")
+            .only("pk", "title", "slug", "is_published", "views")[:limit]
+        )
+
+    def most_read(self, limit=5, site=None):
+        """Posts publicados mais lidos, guardados no cache por 5 minutos."""
+        key = f"blog:most_read:{site.pk if site else 0}:{limit}"
+        posts = cache.get(key)
+        if posts is None:
+            posts = list(self.most_read_queryset(limit, site))
+            cache.set(key, posts, MOST_READ_CACHE_TIMEOUT)
+        return posts
+
+    async def amost_read(self, limit=5, site=None):
+        key = f"blog:most_read:{site.pk if site else 0}:{limit}"
+        posts = await cache.aget(key)
+        if posts is None:
+            posts = [post async for post in self.most_read_queryset(limit, site)]
+            await cache.aset(key, posts, MOST_READ_CACHE_TIMEOUT)
+        return posts
 
 
 class Post(models.Model):
     class Meta:
         verbose_name = "Post"
         verbose_name_plural = "Posts"
+        indexes = [
+            # Recontagem de um mês do ArchiveMonth
+            models.Index(fields=["created_at"], name="blog_post_created_at_idx"),
+        ]
 
     objects = PostManager()
 
@@ -126,8 +325,27 @@ class Post(models.Model):
             "para o post ser exibido publicamente."
         ),
     )
-    content = models.TextField()
-    cover = models.ImageField(upload_to="posts/%Y/%m/", blank=True, default="")
+    site = models.ForeignKey(
+        "site_setup.SiteSetup",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        default=None,
+        help_text="Vazio publica em todos os sites.",
+    )
+    cover = models.ImageField(
+        upload_to="posts/%Y/%m/",
+        storage=ContentAddressedStorage(),
+        blank=True,
+        default="",
+    )
+    # Preenchidos a partir da imagem no save (e pelo backfill_image_metadata)
+    cover_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    cover_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    cover_color = models.CharField(
+        max_length=7, blank=True, default="", editable=False
+    )
+    cover_placeholder = models.TextField(blank=True, default="", editable=False)
     cover_in_post_content = models.BooleanField(
         default=True,
         help_text="Se marcado, exibirá a capa dentro do post.",
@@ -158,10 +376,33 @@ class Post(models.Model):
         default=None,
     )
     tags = models.ManyToManyField(Tag, blank=True, default="")
+    # Somado em lote por blog.view_counts, nunca pelo save
+    views = models.PositiveIntegerField(default=0, db_index=True, editable=False)
+    revisions = GenericRelation("Revision")
+
+    # Valor de content ainda não gravado em PostBody
+    _pending_content = None
 
     def __str__(self):
         return str(self.title)
 
+    @property
+    def content(self):
+        """
+        O HTML do post, guardado em PostBody. Sem select_related("body")
+        cada acesso a um post novo faz uma consulta.
+        """
+        if self._pending_content is not None:
+            return self._pending_content
+        try:
+            return self.body.content
+        except PostBody.DoesNotExist:
+            return ""
+
+    @content.setter
+    def content(self, value):
+        self._pending_content = value
+
     def get_absolute_url(self):
         if not self.is_published:
             return reverse("blog:index")
@@ -171,14 +412,362 @@ class Post(models.Model):
         if not self.slug:
             self.slug = slugify_new(self.title, 4)
 
-        current_cover_name = str(self.cover.name)
+        previous_cover_name = ""
+        if self.pk:
+            previous_cover_name = (
+                Post.objects.filter(pk=self.pk).values_list("cover", flat=True).first()
+            ) or ""
+
         super_save = super().save(*args, **kwargs)
-        cover_changed = False
 
-        if self.cover:
-            cover_changed = current_cover_name != self.cover.name
+        if self._pending_content is not None:
+            self.body, _ = PostBody.objects.update_or_create(
+                post=self,
+                defaults={"content": size_attachment_images(self._pending_content)},
+            )
+            self._pending_content = None
+
+        # Só redimensiona quando o conteúdo ainda não existia no storage
+        if MediaBlob.objects.swap(previous_cover_name, self.cover.name):
+            resize_image(self.cover, **IMAGE_PROFILES["cover"])
 
-        if cover_changed:
-            resize_image(self.cover, 900, True, 70)
+        if previous_cover_name != self.cover.name:
+            fields = image_fields(self.cover, "cover_")
+            Post.objects.filter(pk=self.pk).update(**fields)
+            self.__dict__.update(fields)
 
         return super_save
+
+
+class PostBody(models.Model):
+    """
+    Content do Post numa tabela separada: as listagens leem só a linha do
+    Post, sem arrastar o HTML junto. Use Post.content para ler e gravar.
+    """
+
+    class Meta:
+        verbose_name = "Post body"
+        verbose_name_plural = "Post bodies"
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="body",
+    )
+    content = models.TextField(blank=True, default="")
+
+    def __str__(self):
+        return str(self.post_id)
+
+
+# Curto de propósito: com o cache local de cada processo (locmem), só o
+# processo que salvou o perfil vê a versão nova na hora
+AUTHOR_CACHE_TIMEOUT = 60
+
+
+def author_cache_key(user_id):
+    return f"blog:author:{user_id}"
+
+
+class AuthorProfileManager(models.Manager):
+    def refresh(self, user_ids):
+        """Recalcula nome de exibição e total de posts publicados."""
+        user_ids = {pk for pk in user_ids if pk}
+        counts = dict(
+            Post.objects.get_published()
+            .filter(created_by__in=user_ids)
+            .order_by()
+            .values("created_by")
+            .annotate(total=Count("pk"))
+            .values_list("created_by", "total")
+        )
+        for user in User.objects.filter(pk__in=user_ids):
+            self.update_or_create(
+                user=user,
+                defaults={
+                    "display_name": AuthorProfile.display_name_for(user),
+                    "post_count": counts.get(user.pk, 0),
+                },
+            )
+
+    def cached(self, user_id):
+        profile = cache.get(author_cache_key(user_id))
+        if profile is None:
+            profile = self.filter(pk=user_id).first()
+            if profile is not None:
+                cache.set(author_cache_key(user_id), profile, AUTHOR_CACHE_TIMEOUT)
+        return profile
+
+    async def acached(self, user_id):
+        profile = await cache.aget(author_cache_key(user_id))
+        if profile is None:
+            profile = await self.filter(pk=user_id).afirst()
+            if profile is not None:
+                await cache.aset(
+                    author_cache_key(user_id), profile, AUTHOR_CACHE_TIMEOUT
+                )
+        return profile
+
+
+class AuthorProfile(models.Model):
+    """
+    Dados do autor já prontos para as páginas públicas. Mantido pelos
+    signals de User e Post (blog/signals.py) e guardado no cache.
+    """
+
+    class Meta:
+        verbose_name = "Author profile"
+        verbose_name_plural = "Author profiles"
+
+    objects = AuthorProfileManager()
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="author_profile",
+    )
+    display_name = models.CharField(max_length=255)
+    post_count = models.PositiveIntegerField(default=0)
+    avatar = models.ImageField(
+        upload_to="authors/%Y/%m/",
+        storage=ContentAddressedStorage(),
+        blank=True,
+        default="",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return str(self.display_name)
+
+    @staticmethod
+    def display_name_for(user):
+        if user.first_name:
+            return f"{user.first_name} {user.last_name}"
+        return user.username
+
+    def save(self, *args, **kwargs):
+        previous_avatar_name = ""
+        if not self._state.adding:
+            previous_avatar_name = (
+                AuthorProfile.objects.filter(pk=self.pk)
+                .values_list("avatar", flat=True)
+                .first()
+            ) or ""
+
+        super_save = super().save(*args, **kwargs)
+
+        if MediaBlob.objects.swap(previous_avatar_name, self.avatar.name):
+            resize_image(self.avatar, **IMAGE_PROFILES["avatar"])
+
+        # Grava o perfil novo no cache: uma réplica atrasada não volta a
+        # colocar a versão antiga lá.
+        cache.set(author_cache_key(self.pk), self, AUTHOR_CACHE_TIMEOUT)
+        return super_save
+
+
+def month_range(year, month):
+    """Início e fim (exclusivo) do mês no fuso do site."""
+    tz = timezone.get_current_timezone()
+    start = datetime(year, month, 1, tzinfo=tz)
+    if month == 12:
+        return start, datetime(year + 1, 1, 1, tzinfo=tz)
+    return start, datetime(year, month + 1, 1, tzinfo=tz)
+
+
+def months_of(datetimes):
+    months = set()
+    for value in datetimes:
+        if value is not None:
+            value = timezone.localtime(value)
+            months.add((value.year, value.month))
+    return months
+
+
+class ArchiveMonthManager(models.Manager):
+    def refresh(self, months):
+        """Recalcula os meses [(ano, mês), ...] de todos os sites."""
+        for year, month in set(months):
+            start, end = month_range(year, month)
+            rows = (
+                Post.objects.get_published()
+                .filter(created_at__gte=start, created_at__lt=end)
+                .order_by()
+                .values("site")
+                .annotate(total=Count("pk"), first=Min("pk"), last=Max("pk"))
+            )
+            sites = set()
+            for row in rows:
+                sites.add(row["site"])
+                self.update_or_create(
+                    site_id=row["site"],
+                    year=year,
+                    month=month,
+                    defaults={
+                        "count": row["total"],
+                        "first_id": row["first"],
+                        "last_id": row["last"],
+                    },
+                )
+            for archive in self.filter(year=year, month=month):
+                if archive.site_id not in sites:
+                    archive.delete()
+
+    def for_site(self, site=None):
+        """
+        Meses com posts publicados no site, do mais novo: dicts com year,
+        month, count, first_id e last_id. Soma as linhas do site com as
+        dos posts de todos os sites (site vazio).
+        """
+        queryset = self.all()
+        if site is not None:
+            queryset = queryset.filter(site_filter(site))
+        return (
+            queryset.values("year", "month")
+            .annotate(count=Sum("count"), first_id=Min("first_id"), last_id=Max("last_id"))
+            .order_by("-year", "-month")
+        )
+
+
+class ArchiveMonth(models.Model):
+    """
+    Total e faixa de pks dos posts publicados em cada mês, por site. Mantido
+    pelos signals de Post (blog/signals.py): a página de um mês busca os
+    posts pela faixa de pks, sem OFFSET sobre a listagem inteira.
+    """
+
+    class Meta:
+        verbose_name = "Archive month"
+        verbose_name_plural = "Archive months"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["site", "year", "month"],
+                condition=Q(site__isnull=False),
+                name="blog_archivemonth_unique_site_month",
+            ),
+            models.UniqueConstraint(
+                fields=["year", "month"],
+                condition=Q(site__isnull=True),
+                name="blog_archivemonth_unique_month",
+            ),
+        ]
+
+    objects = ArchiveMonthManager()
+
+    site = models.ForeignKey(
+        "site_setup.SiteSetup",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        default=None,
+    )
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    first_id = models.PositiveBigIntegerField()
+    last_id = models.PositiveBigIntegerField()
+
+    def __str__(self):
+        return f"{self.month:02d}/{self.year}"
+
+
+class RevisionManager(models.Manager):
+    def for_object(self, obj):
+        return self.filter(
+            content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk
+        )
+
+    def record(self, obj, user=None):
+        """
+        Guarda o content atual de obj como uma nova revisão. Retorna None
+        quando ele não mudou desde a última.
+        """
+        text = obj.content
+        last = self.for_object(obj).order_by("-number").first()
+        if last is None:
+            number = 1
+        else:
+            previous = last.text()
+            if previous == text:
+                return None
+            number = last.number + 1
+
+        every = settings.BLOG_REVISION_CHECKPOINT_EVERY
+        is_checkpoint = last is None or (number - 1) % every == 0
+        return self.create(
+            content_type=ContentType.objects.get_for_model(obj),
+            object_id=obj.pk,
+            number=number,
+            is_checkpoint=is_checkpoint,
+            data=pack(text) if is_checkpoint else make_delta(previous, text),
+            size=len(text.encode("utf-8")),
+            created_by=user,
+        )
+
+
+class Revision(models.Model):
+    """
+    Histórico do content de Post e Page. A cada
+    BLOG_REVISION_CHECKPOINT_EVERY revisões uma guarda o texto inteiro
+    (checkpoint); as outras guardam só a diferença para a anterior.
+    """
+
+    class Meta:
+        verbose_name = "Revision"
+        verbose_name_plural = "Revisions"
+        ordering = ("-number",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=("content_type", "object_id", "number"),
+                name="blog_revision_unique_number",
+            ),
+        ]
+
+    objects = RevisionManager()
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey("content_type", "object_id")
+    number = models.PositiveIntegerField()
+    is_checkpoint = models.BooleanField(default=False)
+    data = models.BinaryField()
+    # Tamanho do texto sem compressão, em bytes
+    size = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="+",
+    )
+
+    def __str__(self):
+        return f"{self.content_type} #{self.object_id} r{self.number}"
+
+    def text(self):
+        """Reconstrói o texto a partir do último checkpoint."""
+        siblings = Revision.objects.filter(
+            content_type_id=self.content_type_id, object_id=self.object_id
+        )
+        checkpoint = (
+            siblings.filter(is_checkpoint=True, number__lte=self.number)
+            .order_by("-number")
+            .values_list("number", flat=True)
+            .first()
+        )
+        chain = (
+            siblings.filter(number__gte=checkpoint or 1, number__lte=self.number)
+            .order_by("number")
+            .values_list("is_checkpoint", "data")
+        )
+
+        tokens = []
+        for is_checkpoint, data in chain:
+            data = bytes(data)
+            if is_checkpoint:
+                tokens = tokenize(unpack(data))
+            else:
+                tokens = apply_tokens(tokens, data)
+        return "".join(tokens)
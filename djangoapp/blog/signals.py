@@ -0,0 +1,124 @@
+from blog.models import (
+    ArchiveMonth,
+    AuthorProfile,
+    Category,
+    MediaBlob,
+    Page,
+    Post,
+    PostAttachment,
+    Tag,
+    author_cache_key,
+    months_of,
+)
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import Signal, receiver
+from utils.http_cache import purge_keys
+
+# Enviado uma vez por alteração em lote de posts (ações do admin), com
+# pks=[...] e fields=(...) no lugar de um post_save por linha.
+posts_changed = Signal()
+
+
+@receiver(post_delete, sender=Post)
+def release_post_cover(sender, instance, **kwargs):
+    MediaBlob.objects.release(instance.cover.name)
+
+
+@receiver(post_delete, sender=PostAttachment)
+def release_attachment_file(sender, instance, **kwargs):
+    MediaBlob.objects.release(instance.file.name)
+
+
+@receiver(post_delete, sender=AuthorProfile)
+def release_author_avatar(sender, instance, **kwargs):
+    MediaBlob.objects.release(instance.avatar.name)
+
+
+@receiver(post_delete, sender=AuthorProfile)
+def forget_author_profile(sender, instance, **kwargs):
+    # Apagar o User apaga o perfil em cascata e também passa por aqui
+    cache.delete(author_cache_key(instance.pk))
+
+
+@receiver(post_save, sender=User)
+def refresh_author_profile(sender, instance, update_fields=None, **kwargs):
+    # O login só grava last_login
+    if update_fields and set(update_fields) == {"last_login"}:
+        return
+    AuthorProfile.objects.refresh([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def refresh_post_author(sender, instance, **kwargs):
+    if instance.created_by_id:
+        AuthorProfile.objects.refresh([instance.created_by_id])
+
+
+@receiver(posts_changed, sender=Post)
+def refresh_changed_posts_authors(sender, pks, **kwargs):
+    authors = Post.objects.filter(pk__in=pks).values_list("created_by", flat=True)
+    AuthorProfile.objects.refresh(set(authors))
+
+
+# Campos que mudam o mês ou o site de um post no ArchiveMonth
+ARCHIVE_FIELDS = {"is_published", "site", "created_at"}
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def refresh_post_archive(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not ARCHIVE_FIELDS & set(update_fields):
+        return
+    ArchiveMonth.objects.refresh(months_of([instance.created_at]))
+
+
+@receiver(posts_changed, sender=Post)
+def refresh_changed_posts_archive(sender, pks, fields, **kwargs):
+    if not ARCHIVE_FIELDS & set(fields):
+        return
+    created = Post.objects.filter(pk__in=pks).values_list("created_at", flat=True)
+    ArchiveMonth.objects.refresh(months_of(created))
+
+
+# Purge no proxy de cache (Surrogate-Key das views)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post(sender, instance, **kwargs):
+    purge_keys(f"post-{instance.pk}", "post-list")
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def purge_post_tags(sender, instance, action, **kwargs):
+    if action.startswith("post_") and isinstance(instance, Post):
+        purge_keys(f"post-{instance.pk}", "post-list")
+
+
+@receiver(posts_changed, sender=Post)
+def purge_changed_posts(sender, pks, **kwargs):
+    purge_keys("post-list", *(f"post-{pk}" for pk in pks))
+
+
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Page)
+def purge_page(sender, instance, **kwargs):
+    purge_keys(f"page-{instance.pk}")
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def purge_taxonomy(sender, instance, **kwargs):
+    # O nome aparece nos posts e no título da listagem
+    purge_keys(f"{sender._meta.model_name}-{instance.pk}", "post-list")
+
+
+@receiver(post_save, sender=AuthorProfile)
+@receiver(post_delete, sender=AuthorProfile)
+def purge_author(sender, instance, **kwargs):
+    purge_keys(f"author-{instance.pk}")
@@ -1,14 +1,34 @@
-from . import views
+from . import async_views, views
+from django.conf import settings
 from django.urls import path
 
 app_name = "blog"
 
+if settings.BLOG_ASYNC_VIEWS:
+    index_view = async_views.AsyncPostListView.as_view()
+    post_view = async_views.AsyncPostDetailView.as_view()
+    page_view = async_views.AsyncPageDetailView.as_view()
+    search_view = async_views.AsyncSearchListView.as_view()
+else:
+    index_view = views.PostListView.as_view()
+    post_view = views.PostDetailView.as_view()
+    page_view = views.PageDetailView.as_view()
+    search_view = views.SearchListView.as_view()
+
 urlpatterns = [
-    path("", views.PostListView.as_view(), name="index"),
-    path("post/<slug:slug>/", views.PostDetailView.as_view(), name="post"),
-    path("page/<slug:slug>/", views.PageDetailView.as_view(), name="page"),
+    path("", index_view, name="index"),
+    path("post/<slug:slug>/", post_view, name="post"),
+    path("post/<int:pk>/view/", views.record_post_view, name="post_view"),
+    path("page/<slug:slug>/", page_view, name="page"),
     path("created_by/<int:author_pk>/", views.CreatedByListView.as_view(), name="created_by"),
     path("category/<slug:slug>/", views.CategoryListView.as_view(), name="category"),
     path("tag/<slug:slug>/", views.TagListView.as_view(), name="tag"),
-    path("search/", views.SearchListView.as_view(), name="search"),
+    path("search/", search_view, name="search"),
+    path("archive/", views.ArchiveView.as_view(), name="archive"),
+    path("archive/<int:year>/", views.ArchiveView.as_view(), name="archive_year"),
+    path(
+        "archive/<int:year>/<int:month>/",
+        views.ArchiveMonthListView.as_view(),
+        name="archive_month",
+    ),
 ]
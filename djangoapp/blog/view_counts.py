@@ -0,0 +1,169 @@
+"""
+Contador de visualizações dos posts com escrita em lote.
+
+Cada visualização só soma 1 num buffer (memória do processo ou cache,
+BLOG_VIEW_COUNTER). A cada BLOG_VIEW_FLUSH_SECONDS, ou quando o buffer
+passa de BLOG_VIEW_FLUSH_SIZE posts, os totais vão para o banco com um
+UPDATE ... SET views = views + n por valor de n.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBuffer:
+    """Visualizações guardadas na memória do processo."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = Counter()
+
+    def add(self, pk):
+        with self.lock:
+            self.hits[pk] += 1
+
+    def size(self):
+        return len(self.hits)
+
+    def drain(self):
+        with self.lock:
+            hits, self.hits = self.hits, Counter()
+        return hits
+
+    def restore(self, hits):
+        with self.lock:
+            self.hits.update(hits)
+
+
+class CacheBuffer:
+    """
+    Visualizações somadas no cache (cache.incr), compartilhadas entre os
+    processos. Cada processo descarrega os posts que ele viu; o decr tira
+    só o que foi lido, sem perder o que chegou no meio tempo. Dois
+    processos podem ler o mesmo valor: quem deixar a chave negativa no decr
+    devolve o excesso e conta só o que de fato tirou.
+
+    As chaves expiram (KEY_TIMEOUT, bem acima do intervalo de flush) e são
+    apagadas quando o decr as zera; uma visualização que chegue entre o
+    decr e o delete se perde.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.timeout = max(60 * 60, settings.BLOG_VIEW_FLUSH_SECONDS * 10)
+
+    def key(self, pk):
+        return f"blog:views:{pk}"
+
+    def add(self, pk):
+        key = self.key(pk)
+        if not cache.add(key, 1, self.timeout):
+            try:
+                cache.incr(key)
+            except ValueError:
+                # A chave sumiu entre o add e o incr
+                cache.add(key, 1, self.timeout)
+        with self.lock:
+            self.pending.add(pk)
+
+    def size(self):
+        return len(self.pending)
+
+    def drain(self):
+        with self.lock:
+            pks, self.pending = self.pending, set()
+        values = cache.get_many([self.key(pk) for pk in pks])
+        hits = Counter()
+        for pk in pks:
+            count = values.get(self.key(pk))
+            if count is None or count <= 0:
+                continue
+            try:
+                remaining = cache.decr(self.key(pk), count)
+            except ValueError:
+                # A chave expirou ou foi descartada depois do get_many
+                continue
+            if remaining == 0:
+                cache.delete(self.key(pk))
+            elif remaining < 0:
+                returned = min(count, -remaining)
+                cache.incr(self.key(pk), returned)
+                count -= returned
+            if count > 0:
+                hits[pk] = count
+        return hits
+
+    def restore(self, hits):
+        for pk, count in hits.items():
+            if not cache.add(self.key(pk), count, self.timeout):
+                cache.incr(self.key(pk), count)
+        with self.lock:
+            self.pending.update(hits)
+
+
+class ViewCounter:
+    def __init__(self, buffer, flush_seconds, flush_size):
+        self.buffer = buffer
+        self.flush_seconds = flush_seconds
+        self.flush_size = flush_size
+        self.flush_lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    def hit(self, pk):
+        self.buffer.add(pk)
+        if (
+            self.buffer.size() >= self.flush_size
+            or time.monotonic() - self.last_flush >= self.flush_seconds
+        ):
+            self.flush()
+
+    def flush(self):
+        # Só um flush por vez; quem chegar durante um flush segue em frente
+        if not self.flush_lock.acquire(blocking=False):
+            return
+        try:
+            self.last_flush = time.monotonic()
+            hits = self.buffer.drain()
+            if not hits:
+                return
+
+            by_count = defaultdict(list)
+            for pk, count in hits.items():
+                by_count[count].append(pk)
+
+            from blog.models import Post
+
+            try:
+                with transaction.atomic():
+                    for count, pks in by_count.items():
+                        Post.objects.filter(pk__in=pks).update(
+                            views=F("views") + count
+                        )
+            except DatabaseError:
+                logger.exception("Falha ao gravar as visualizações; tentando depois")
+                self.buffer.restore(hits)
+        finally:
+            self.flush_lock.release()
+
+
+def build_counter():
+    buffers = {"memory": MemoryBuffer, "cache": CacheBuffer}
+    return ViewCounter(
+        buffers[settings.BLOG_VIEW_COUNTER](),
+        settings.BLOG_VIEW_FLUSH_SECONDS,
+        settings.BLOG_VIEW_FLUSH_SIZE,
+    )
+
+
+counter = build_counter()
+atexit.register(counter.flush)
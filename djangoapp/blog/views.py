@@ -1,29 +1,143 @@
+import inspect
+import uuid
 from typing import Any
 
-from blog.models import Page, Post
+from blog.models import (
+    ArchiveMonth,
+    AuthorProfile,
+    Page,
+    Post,
+    PostBody,
+    month_range,
+)
+from blog.view_counts import counter as view_counter
 from django import http
-from django.contrib.auth.models import User
+from django.conf import settings
 from django.core.paginator import Paginator
 from django.db import models
 from django.db.models.query import QuerySet
 from django.db.models.query_utils import Q
-from django.http import Http404, HttpRequest, HttpResponse
+from django.http import Http404, HttpRequest, HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
-from django.views.generic import DetailView, ListView
+from django.template.loader import render_to_string
+from django.utils.dates import MONTHS
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from django.views.generic import DetailView, ListView, TemplateView
+from utils.db_routers import no_sticky_primary
+from utils.http_cache import apply_cache_policy
 
 PER_PAGE = 9
 
+LIST_CACHE_MAX_AGE = 60 * 5
+DETAIL_CACHE_MAX_AGE = 60 * 60 * 24
+
+# Tamanho dos pedaços do content no modo BLOG_STREAM_POSTS
+CONTENT_CHUNK_SIZE = 16 * 1024
+
+
+def post_surrogate_keys(post: Post) -> list[str]:
+    keys = [f"post-{post.pk}", "site"]
+    if post.created_by_id:
+        keys.append(f"author-{post.created_by_id}")
+    if post.category_id:
+        keys.append(f"category-{post.category_id}")
+    keys += [f"tag-{tag.pk}" for tag in post.tags.all()]
+    return keys
+
+
+def split_post_template(
+    request: HttpRequest, template_name: str, context: dict[str, Any]
+) -> list[str]:
+    """
+    Renderiza o post.html sem o content e devolve [antes, depois] dele. O
+    template coloca o marcador no lugar do content.
+    """
+    marker = f"post-content-{uuid.uuid4().hex}"
+    html = render_to_string(
+        template_name, {**context, "content_marker": marker}, request
+    )
+    return html.split(marker, 1)
+
+
+def post_content_chunks(content: str):
+    for start in range(0, len(content), CONTENT_CHUNK_SIZE):
+        yield content[start : start + CONTENT_CHUNK_SIZE]
+
+
+def stream_post(head: str, post_pk: int, tail: str, using: str):
+    """
+    Roda depois que o ReplicaMiddleware já liberou a requisição, por isso
+    recebe o banco (using) de onde o post foi lido. Só sai aos poucos sob
+    WSGI: no ASGI o Django 4.2 consome iteradores síncronos inteiros antes
+    de enviar (lá o streaming é o de async_views.astream_post).
+    """
+    yield head
+    # O content só sai do banco depois que o topo da página foi enviado
+    content = (
+        PostBody.objects.using(using)
+        .filter(pk=post_pk)
+        .values_list("content", flat=True)
+    )
+    yield from post_content_chunks(content.first() or "")
+    yield tail
+
+
+class CachePolicyMixin:
+    """
+    Cache-Control (s-maxage + stale-while-revalidate) e Surrogate-Key das
+    respostas para o proxy de cache. Ver utils/http_cache.py.
+    """
+
+    cache_max_age = 0
+    cache_stale_while_revalidate = 0
+
+    def get_surrogate_keys(self) -> list[str]:
+        return ["site"]
+
+    def apply_cache_policy(self, response: HttpResponse) -> HttpResponse:
+        return apply_cache_policy(
+            self.request,  # type: ignore
+            response,
+            self.cache_max_age,
+            self.cache_stale_while_revalidate,
+            self.get_surrogate_keys(),
+        )
+
+    def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any) -> Any:
+        response = super().dispatch(request, *args, **kwargs)  # type: ignore
+        if inspect.isawaitable(response):
+            return self.adispatch_cache_policy(response)
+        return self.apply_cache_policy(response)
+
+    async def adispatch_cache_policy(self, response: Any) -> HttpResponse:
+        return self.apply_cache_policy(await response)
+
 
-class PostListView(ListView):
+class PostListView(CachePolicyMixin, ListView):
     model = Post
     template_name = "blog/pages/index.html"
     context_object_name = "posts"
     ordering = "-created_at"
     paginate_by = PER_PAGE
-    queryset = Post.objects.get_published()
+    cache_max_age = LIST_CACHE_MAX_AGE
+    cache_stale_while_revalidate = 60
+    show_most_read = True
+
+    def get_surrogate_keys(self) -> list[str]:
+        # Os posts da página já foram buscados para o template
+        posts = getattr(self, "_listed_posts", [])
+        return ["site", "post-list", *(f"post-{post.pk}" for post in posts)]
+
+    def get_queryset(self) -> QuerySet[Any]:
+        self.queryset = Post.objects.get_published(self.request.site_setup)
+        return super().get_queryset()
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
+        self._listed_posts = context["object_list"]
+        if self.show_most_read:
+            context["most_read"] = Post.objects.most_read(site=self.request.site_setup)
 
         context.update(
             {
@@ -34,34 +148,45 @@ class PostListView(ListView):
 
 
 class CreatedByListView(PostListView):
+    show_most_read = False
+
     def __init__(self, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         self._temp_context: dict[str, Any] = {}
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         ctx = super().get_context_data(**kwargs)
-        user = self._temp_context["user"]
-        user_full_name = user.username
-        if user.first_name:
-            user_full_name = f"{user.first_name} {user.last_name}"
-        page_title = f"Posts de {user_full_name}  - "
+        author = self._temp_context["author"]
+        page_title = f"Posts de {author.display_name}  - "
         ctx.update({"page_title": page_title})
 
         return ctx
 
     def get_queryset(self) -> QuerySet[Any]:
         qs = super().get_queryset()
-        qs = qs.filter(created_by__pk=self._temp_context["user"].pk)
+        qs = qs.filter(created_by__pk=self._temp_context["author"].pk)
         return qs
 
+    def get_surrogate_keys(self) -> list[str]:
+        keys = super().get_surrogate_keys()
+        return [*keys, f"author-{self._temp_context['author'].pk}"]
+
+    def get_paginator(self, *args: Any, **kwargs: Any) -> Paginator:
+        paginator = super().get_paginator(*args, **kwargs)
+        # Total mantido pelos signals no AuthorProfile, sem COUNT(*). Ele
+        # conta os posts de todos os sites: com vários, o COUNT(*) volta.
+        if self.request.single_site:
+            paginator.count = self._temp_context["author"].post_count
+        return paginator
+
     def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
         author_pk = self.kwargs.get("author_pk")
-        user = User.objects.filter(pk=author_pk).first()
+        author = AuthorProfile.objects.cached(author_pk)
 
-        if user is None:
+        if author is None:
             raise Http404()
 
-        self._temp_context.update({"author_pk": author_pk, "user": user})
+        self._temp_context.update({"author_pk": author_pk, "author": author})
 
         return super().get(request, *args, **kwargs)
 
@@ -91,6 +216,7 @@ class CreatedByListView(PostListView):
 
 
 class CategoryListView(PostListView):
+    show_most_read = False
     allow_empty = False
 
     def get_queryset(self) -> QuerySet[Any]:
@@ -127,6 +253,7 @@ class CategoryListView(PostListView):
 
 
 class TagListView(PostListView):
+    show_most_read = False
     allow_empty = False
 
     def get_queryset(self) -> QuerySet[Any]:
@@ -163,6 +290,10 @@ class TagListView(PostListView):
 
 
 class SearchListView(PostListView):
+    show_most_read = False
+    cache_max_age = 60
+    cache_stale_while_revalidate = 30
+
     def __init__(self, **kwargs: Any):
         super().__init__(**kwargs)
         self._search_value = ""
@@ -178,7 +309,7 @@ class SearchListView(PostListView):
             .get_queryset()
             .filter(
                 Q(title__icontains=search_value)
-                | Q(content__icontains=search_value)
+                | Q(body__content__icontains=search_value)
                 | Q(excerpt__icontains=search_value)
             )[:PER_PAGE]
         )
@@ -217,21 +348,26 @@ class SearchListView(PostListView):
 #     )
 
 
-class PageDetailView(DetailView):
+class PageDetailView(CachePolicyMixin, DetailView):
     model = Page
     template_name = "blog/pages/page.html"
     slug_field = "slug"
     context_object_name = "page"
+    cache_max_age = DETAIL_CACHE_MAX_AGE
+    cache_stale_while_revalidate = 60 * 60
+
+    def get_surrogate_keys(self) -> list[str]:
+        return ["site", f"page-{self.object.pk}"]
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         ctx = super().get_context_data(**kwargs)
-        page = self.get_object()
+        page = self.object
         page_title = f"{page.title} - Página - "
         ctx.update({"page_title": page_title})
         return ctx
 
     def get_queryset(self) -> QuerySet[Any]:
-        return super().get_queryset().filter(is_published=True)
+        return Page.objects.get_published(self.request.site_setup)
 
 
 # def page(request, slug):
@@ -252,21 +388,45 @@ class PageDetailView(DetailView):
 #     )
 
 
-class PostDetailView(DetailView):
+class PostDetailView(CachePolicyMixin, DetailView):
     model = Post
     template_name = "blog/pages/post.html"
     slug_field = "slug"
-    context_object_name = "page"
+    context_object_name = "post"
+    cache_max_age = DETAIL_CACHE_MAX_AGE
+    cache_stale_while_revalidate = 60 * 60
+
+    def get_surrogate_keys(self) -> list[str]:
+        return post_surrogate_keys(self.object)
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         ctx = super().get_context_data(**kwargs)
-        post = self.get_object()
+        post = self.object
         page_title = f"{post.title} - Post - "
-        ctx.update({"page_title": page_title})
+        author = None
+        if post.created_by_id:
+            author = AuthorProfile.objects.cached(post.created_by_id)
+        ctx.update({"page_title": page_title, "author": author})
         return ctx
 
     def get_queryset(self) -> QuerySet[Any]:
-        return super().get_queryset().filter(is_published=True)
+        # As tags servem ao template e ao Surrogate-Key com uma só consulta
+        qs = Post.objects.get_published(self.request.site_setup).prefetch_related(
+            "tags"
+        )
+        if not settings.BLOG_STREAM_POSTS:
+            # No streaming o content é buscado só depois do topo da página
+            qs = qs.select_related("body")
+        return qs
+
+    def render_to_response(self, context: dict[str, Any], **response_kwargs: Any):
+        if not settings.BLOG_STREAM_POSTS:
+            return super().render_to_response(context, **response_kwargs)
+
+        head, tail = split_post_template(self.request, self.template_name, context)
+        return StreamingHttpResponse(
+            stream_post(head, self.object.pk, tail, self.object._state.db)
+        )
 
 
 # def post(request, slug):
@@ -285,3 +445,86 @@ class PostDetailView(DetailView):
 #             "page_title": page_title,
 #         },
 #     )
+
+
+class ArchiveView(CachePolicyMixin, TemplateView):
+    """Meses com posts (todos ou de um ano), só com o ArchiveMonth."""
+
+    template_name = "blog/pages/archive.html"
+    cache_max_age = LIST_CACHE_MAX_AGE
+    cache_stale_while_revalidate = 60
+
+    def get_surrogate_keys(self) -> list[str]:
+        return ["site", "post-list"]
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        ctx = super().get_context_data(**kwargs)
+        year = self.kwargs.get("year")
+        months = ArchiveMonth.objects.for_site(self.request.site_setup)
+        if year is not None:
+            months = months.filter(year=year)
+
+        months = [{**month, "name": MONTHS[month["month"]]} for month in months]
+        if year is not None and not months:
+            raise Http404()
+
+        page_title = f"{year} - Arquivo - " if year else "Arquivo - "
+        ctx.update({"months": months, "year": year, "page_title": page_title})
+        return ctx
+
+
+class ArchiveMonthListView(PostListView):
+    show_most_read = False
+
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        self.archive = (
+            ArchiveMonth.objects.for_site(request.site_setup)
+            .filter(year=self.kwargs["year"], month=self.kwargs["month"])
+            .first()
+        )
+        if self.archive is None:
+            raise Http404()
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self) -> QuerySet[Any]:
+        start, end = month_range(self.archive["year"], self.archive["month"])
+        # A faixa de pks do mês limita a leitura ao índice da chave
+        # primária; o created_at só confirma o mês
+        return (
+            super()
+            .get_queryset()
+            .filter(
+                pk__range=(self.archive["first_id"], self.archive["last_id"]),
+                created_at__gte=start,
+                created_at__lt=end,
+            )
+        )
+
+    def get_paginator(self, *args: Any, **kwargs: Any) -> Paginator:
+        paginator = super().get_paginator(*args, **kwargs)
+        # Total já contado no ArchiveMonth, sem COUNT(*)
+        paginator.count = self.archive["count"]
+        return paginator
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        ctx = super().get_context_data(**kwargs)
+        month = MONTHS[self.archive["month"]].capitalize()
+        ctx.update({"page_title": f"{month} de {self.archive['year']} - Arquivo - "})
+        return ctx
+
+
+@csrf_exempt
+@no_sticky_primary
+@require_POST
+def record_post_view(request: HttpRequest, pk: int) -> HttpResponse:
+    """
+    Recebe o navigator.sendBeacon do post.html: a página do post fica no
+    cache do proxy e não passa pelo Django a cada leitura. Só conta posts
+    publicados do site atual.
+    """
+    if not Post.objects.get_published(request.site_setup).filter(pk=pk).exists():
+        raise Http404()
+    view_counter.hit(pk)
+    response = HttpResponse(status=204)
+    response["Cache-Control"] = "private, no-store"
+    return response
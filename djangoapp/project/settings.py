@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import lazy
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -55,23 +57,35 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "utils.slow_requests.SlowRequestMiddleware",
+    "utils.db_routers.ReplicaMiddleware",
+    "site_setup.middleware.SiteSetupMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "axes.middleware.AxesMiddleware",
+    "utils.axes.AdminAxesMiddleware",
 ]
 
 ROOT_URLCONF = "project.urls"
 
+template_loaders = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+if not DEBUG:
+    # Compila cada template uma vez por processo
+    template_loaders = [("django.template.loaders.cached.Loader", template_loaders)]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [],
-        "APP_DIRS": True,
         "OPTIONS": {
+            "loaders": template_loaders,
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -85,6 +99,33 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "project.wsgi.application"
 
+# Usa as views async de blog/async_views.py (index, post, page e busca).
+# Só faz sentido rodando sob ASGI (ASGI=1 no scripts/runserver.sh).
+BLOG_ASYNC_VIEWS = bool(int(os.getenv("BLOG_ASYNC_VIEWS", 0)))
+# Envia o topo da página do post antes de buscar e enviar o content.
+# Sob ASGI só funciona com BLOG_ASYNC_VIEWS = 1: a view síncrona é
+# consumida inteira pelo Django antes de sair.
+BLOG_STREAM_POSTS = bool(int(os.getenv("BLOG_STREAM_POSTS", 0)))
+# Visualizações dos posts (blog/view_counts.py): somadas em "memory" (por
+# processo) ou "cache" e gravadas em lote a cada N segundos ou N posts.
+BLOG_VIEW_COUNTER = os.getenv("BLOG_VIEW_COUNTER", "memory")
+BLOG_VIEW_FLUSH_SECONDS = int(os.getenv("BLOG_VIEW_FLUSH_SECONDS", 30))
+BLOG_VIEW_FLUSH_SIZE = int(os.getenv("BLOG_VIEW_FLUSH_SIZE", 500))
+# Revisões do content (blog.models.Revision): texto inteiro a cada N
+# revisões, só a diferença para a anterior no meio.
+BLOG_REVISION_CHECKPOINT_EVERY = int(os.getenv("BLOG_REVISION_CHECKPOINT_EVERY", 20))
+
+# Requisições lentas (utils/slow_requests.py): as que passam de
+# SLOW_REQUEST_MS (0 = desligado) vão para um arquivo JSONL que gira por
+# tamanho. SQL anotado em SLOW_REQUEST_SAMPLE das requisições e cProfile em
+# SLOW_REQUEST_PROFILE_SAMPLE (frações de 0 a 1).
+SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", 0))
+SLOW_REQUEST_SAMPLE = float(os.getenv("SLOW_REQUEST_SAMPLE", 1))
+SLOW_REQUEST_PROFILE_SAMPLE = float(os.getenv("SLOW_REQUEST_PROFILE_SAMPLE", 0))
+SLOW_REQUEST_LOG = os.getenv("SLOW_REQUEST_LOG", str(DATA_DIR / "slow_requests.jsonl"))
+SLOW_REQUEST_LOG_MAX_BYTES = int(os.getenv("SLOW_REQUEST_LOG_MAX_BYTES", 10 * 1024**2))
+SLOW_REQUEST_LOG_BACKUPS = int(os.getenv("SLOW_REQUEST_LOG_BACKUPS", 5))
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
@@ -100,6 +141,72 @@ DATABASES = {
     }
 }
 
+# Réplicas de leitura: DB_REPLICAS="replica1.host,replica2.host" (com SQLite,
+# caminhos de arquivos). Ver utils/db_routers.py.
+DB_REPLICAS = [
+    replica.strip()
+    for replica in os.getenv("DB_REPLICAS", "").split(",")
+    if replica.strip()
+]
+for index, replica in enumerate(DB_REPLICAS, start=1):
+    is_sqlite = DATABASES["default"]["ENGINE"].endswith("sqlite3")
+    replica_key = "NAME" if is_sqlite else "HOST"
+    DATABASES[f"replica{index}"] = {
+        **DATABASES["default"],
+        replica_key: replica,
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["utils.db_routers.ReplicaRouter"]
+DB_PRIMARY_PATHS = ("/admin/", "/summernote/")
+DB_PRIMARY_STICKY_SECONDS = int(os.getenv("DB_PRIMARY_STICKY_SECONDS", 10))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Ex.: CACHE_BACKEND="django.core.cache.backends.redis.RedisCache" e
+# CACHE_LOCATION="redis://redis:6379/1"
+
+CACHE_BACKEND = os.getenv(
+    "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+)
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    },
+    # Contadores do django-axes. Tem que ser compartilhado entre os processos
+    # (Redis/Memcached); sem AXES_CACHE_BACKEND usa o mesmo backend do
+    # default. Com o locmem o AXES_HANDLER fica no banco (ver abaixo).
+    # Na mesma LOCATION do default (o mesmo DB do Redis), um cache.clear()
+    # do default apaga também os bloqueios: use AXES_CACHE_LOCATION própria.
+    "axes": {
+        "BACKEND": os.getenv("AXES_CACHE_BACKEND", CACHE_BACKEND),
+        "LOCATION": os.getenv(
+            "AXES_CACHE_LOCATION", os.getenv("CACHE_LOCATION", "") or "axes"
+        ),
+    },
+}
+
+# Purge do proxy de cache na frente do site (utils/http_cache.py). Vazio
+# desliga o purge; os cabeçalhos Cache-Control/Surrogate-Key saem sempre.
+CACHE_PURGE_URL = os.getenv("CACHE_PURGE_URL", "")
+CACHE_PURGE_METHOD = os.getenv("CACHE_PURGE_METHOD", "PURGE")
+CACHE_PURGE_TIMEOUT = float(os.getenv("CACHE_PURGE_TIMEOUT", 2))
+
+
+# Sessões
+# https://docs.djangoproject.com/en/4.2/topics/http/sessions/
+# SESSION_BACKEND: "cached_db" (lê do cache, grava no banco), "cache" (só o
+# cache; precisa de um cache compartilhado como o Redis), "signed_cookies"
+# (nada no servidor) ou "db". Sessões expiradas no banco são apagadas pelo
+# comando purge_sessions.
+
+SESSION_ENGINE = "django.contrib.sessions.backends." + os.getenv(
+    "SESSION_BACKEND", "cached_db"
+)
+SESSION_CACHE_ALIAS = os.getenv("SESSION_CACHE_ALIAS", "default")
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -148,11 +255,50 @@ STATIC_ROOT = DATA_DIR / "static"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = DATA_DIR / "media"
 
+# Como utils.media.serve_media entrega os arquivos de MEDIA_ROOT:
+# "django" (FileResponse + Range), "x-accel-redirect" (nginx) ou
+# "x-sendfile" (apache/lighttpd).
+MEDIA_SERVE_MODE = os.getenv("MEDIA_SERVE_MODE", "django")
+MEDIA_ACCEL_REDIRECT_LOCATION = os.getenv(
+    "MEDIA_ACCEL_REDIRECT_LOCATION", "/protected-media/"
+)
+MEDIA_CACHE_MAX_AGE = int(os.getenv("MEDIA_CACHE_MAX_AGE", 60 * 60))
+# Uploads nesses caminhos nunca são sobrescritos: cache de 1 ano "immutable"
+MEDIA_IMMUTABLE_PREFIXES = (
+    "posts/",
+    "assets/favicon/",
+    "assets/icons/",
+    "django-summernote/",
+)
+
+# O collectstatic gera nomes com hash do conteúdo (style.3f2a1c.css) e as
+# versões .gz/.br de cada arquivo. O WhiteNoise serve os arquivos com hash
+# com cache "immutable" de 10 anos; os demais usam WHITENOISE_MAX_AGE.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+WHITENOISE_MAX_AGE = int(os.getenv("WHITENOISE_MAX_AGE", 60 * 60))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+
+def static_url(path):
+    # Importado aqui: o settings é carregado antes dos apps
+    from django.templatetags.static import static
+
+    return static(path)
+
+
+static_lazy = lazy(static_url, str)
+
 SUMMERNOTE_CONFIG = {
     "summernote": {
         # Toolbar customization
@@ -186,14 +332,46 @@ SUMMERNOTE_CONFIG = {
             "theme": "dracula",
         },
     },
-    "css": (
-        "//cdnjs.cloudflare.com/ajax/libs/codemirror/6.65.7/theme/dracula.min.css",
+    # Cópias locais (blog/static/blog/vendor) no lugar da CDN, com os nomes
+    # do manifest (hash) resolvidos só quando o editor é montado
+    "codemirror_css": (static_lazy("blog/vendor/codemirror/lib/codemirror.min.css"),),
+    "codemirror_js": (
+        static_lazy("blog/vendor/codemirror/lib/codemirror.min.js"),
+        static_lazy("blog/vendor/codemirror/mode/xml/xml.min.js"),
+        static_lazy("blog/vendor/codemirror/mode/htmlmixed/htmlmixed.min.js"),
     ),
+    "css": (static_lazy("blog/vendor/codemirror/theme/dracula.min.css"),),
     "attachment_filesize_limit": 30 * 1024 * 1024,
     "attachment_model": "blog.PostAttachment",
+    "attachment_storage_class": "utils.storages.ContentAddressedStorage",
 }
 
 AXES_ENABLED = True
 AXES_FAILURE_LIMIT = 6
 AXES_COOLOFF_TIME = 1  # 1 HORA
 AXES_RESET_ON_SUCCESS = True
+# Tentativas de login contadas no cache "axes", sem gravar no banco, só
+# quando ele é compartilhado entre os processos. Num cache por processo
+# (locmem) cada worker contaria as suas e o limite viraria
+# AXES_FAILURE_LIMIT x workers, zerado a cada restart: aí vale o banco.
+AXES_CACHE = "axes"
+AXES_SHARED_CACHE = not CACHES[AXES_CACHE]["BACKEND"].endswith(
+    ("locmem.LocMemCache", "dummy.DummyCache")
+)
+AXES_HANDLER = os.getenv(
+    "AXES_HANDLER",
+    "axes.handlers.cache.AxesCacheHandler"
+    if AXES_SHARED_CACHE
+    else "axes.handlers.database.AxesDatabaseHandler",
+)
+if AXES_HANDLER.endswith("AxesCacheHandler") and not AXES_SHARED_CACHE:
+    raise ImproperlyConfigured(
+        "AXES_HANDLER com cache exige um AXES_CACHE_BACKEND compartilhado "
+        "(Redis/Memcached)."
+    )
+AXES_ONLY_ADMIN_SITE = True
+# utils.axes.AdminAxesMiddleware só age nesses caminhos
+AXES_MIDDLEWARE_PATHS = ("/admin/",)
+
+# O AdminAxesMiddleware é uma subclasse do axes.middleware.AxesMiddleware
+SILENCED_SYSTEM_CHECKS = ["axes.W002"]
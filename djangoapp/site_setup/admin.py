@@ -1,5 +1,4 @@
 from django.contrib import admin
-from django.http.request import HttpRequest
 from site_setup.models import MenuLink, SiteSetup
 
 
@@ -21,8 +20,7 @@ class SiteSetupAdmin(admin.ModelAdmin):
     list_display = (
         "title",
         "description",
+        "hostnames",
+        "is_default",
     )
     inlines = (MenuLinkInline,)
-
-    def has_add_permission(self, request: HttpRequest):
-        return not SiteSetup.objects.exists()
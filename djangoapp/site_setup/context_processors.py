@@ -1,6 +1,3 @@
-from site_setup.models import SiteSetup
-
-
 def site_setup(request):
-    setup = SiteSetup.objects.order_by("-id").first()
-    return {"site_setup": setup}
+    # Resolvido pelo domínio no site_setup.middleware.SiteSetupMiddleware
+    return {"site_setup": getattr(request, "site_setup", None)}
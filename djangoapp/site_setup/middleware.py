@@ -0,0 +1,31 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from site_setup.sites import aget_host_map, get_host_map, is_single_site, site_for_host
+
+
+class SiteSetupMiddleware:
+    """
+    Coloca em request.site_setup o SiteSetup do domínio da requisição (ou
+    o padrão) e em request.single_site se há um site só.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def set_site(self, request, host_map):
+        request.site_setup = site_for_host(host_map, request.get_host())
+        request.single_site = is_single_site(host_map)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.set_site(request, get_host_map())
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.set_site(request, await aget_host_map())
+        return await self.get_response(request)
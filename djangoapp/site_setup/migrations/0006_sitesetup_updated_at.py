@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('site_setup', '0005_alter_sitesetup_favicon'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitesetup',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('site_setup', '0006_sitesetup_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitesetup',
+            name='icons_dir',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+    ]
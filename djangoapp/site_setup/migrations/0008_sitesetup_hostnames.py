@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('site_setup', '0007_sitesetup_icons_dir'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitesetup',
+            name='hostnames',
+            field=models.CharField(blank=True, default='', help_text='Domínios atendidos por este site, separados por espaço ou vírgula (ex.: blog.exemplo.com www.exemplo.com).', max_length=1024),
+        ),
+        migrations.AddField(
+            model_name='sitesetup',
+            name='is_default',
+            field=models.BooleanField(default=False, help_text='Usado quando o domínio da requisição não é de nenhum site.'),
+        ),
+    ]
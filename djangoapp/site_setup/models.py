@@ -1,7 +1,15 @@
+import logging
+import re
+
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
 from django.db import models
-from utils.images import resize_image
+from utils.icons import build_icon_set, icons_dir_for
+from utils.images import IMAGE_PROFILES, resize_image
 from utils.model_validators import validate_png
 
+logger = logging.getLogger(__name__)
+
 
 # Create your models here.
 class MenuLink(models.Model):
@@ -27,6 +35,19 @@ class SiteSetup(models.Model):
 
     title = models.CharField(max_length=65)
     description = models.CharField(max_length=255)
+    hostnames = models.CharField(
+        max_length=1024,
+        blank=True,
+        default="",
+        help_text=(
+            "Domínios atendidos por este site, separados por espaço ou "
+            "vírgula (ex.: blog.exemplo.com www.exemplo.com)."
+        ),
+    )
+    is_default = models.BooleanField(
+        default=False,
+        help_text="Usado quando o domínio da requisição não é de nenhum site.",
+    )
     show_header = models.BooleanField(default=True)
     show_search = models.BooleanField(default=True)
     show_menu = models.BooleanField(default=True)
@@ -34,6 +55,10 @@ class SiteSetup(models.Model):
     show_pagination = models.BooleanField(default=True)
     show_footer = models.BooleanField(default=True)
 
+    # Versão usada nas chaves do cache de header/footer; é atualizada
+    # também quando um MenuLink muda (site_setup/signals.py).
+    updated_at = models.DateTimeField(auto_now=True)
+
     favicon = models.ImageField(
         upload_to="assets/favicon/%Y/%m",
         blank=True,
@@ -42,17 +67,69 @@ class SiteSetup(models.Model):
         validators=[validate_png],
     )
 
+    # Ícones gerados do favicon (utils/icons.py), relativo a MEDIA_ROOT
+    icons_dir = models.CharField(max_length=255, blank=True, default="", editable=False)
+
+    def host_list(self):
+        return [
+            host.lower().rstrip(".")
+            for host in re.split(r"[\s,]+", self.hostnames)
+            if host
+        ]
+
+    def clean(self):
+        hosts = set(self.host_list())
+        for other in SiteSetup.objects.exclude(pk=self.pk).only("title", "hostnames"):
+            repeated = hosts.intersection(other.host_list())
+            if repeated:
+                raise ValidationError(
+                    {"hostnames": f"{', '.join(sorted(repeated))} já é de {other}."}
+                )
+
+    @property
+    def icon_urls(self):
+        if not self.icons_dir:
+            return {}
+        return {
+            "ico": default_storage.url(f"{self.icons_dir}/favicon.ico"),
+            "png16": default_storage.url(f"{self.icons_dir}/favicon-16x16.png"),
+            "png32": default_storage.url(f"{self.icons_dir}/favicon-32x32.png"),
+            "apple": default_storage.url(f"{self.icons_dir}/apple-touch-icon.png"),
+            "manifest": default_storage.url(f"{self.icons_dir}/site.webmanifest"),
+        }
+
     def save(self, *args, **kwargs):
-        current_favicon_name = str(self.favicon.name)
-        print("current_favicon_name: ", current_favicon_name)
-        super().save(*args, **kwargs)
-        favicon_changed = False
+        previous_favicon_name = ""
+        if self.pk:
+            previous_favicon_name = (
+                SiteSetup.objects.filter(pk=self.pk)
+                .values_list("favicon", flat=True)
+                .first()
+            ) or ""
+
+        super_save = super().save(*args, **kwargs)
+
+        if self.is_default:
+            SiteSetup.objects.exclude(pk=self.pk).update(is_default=False)
+
+        if self.favicon and previous_favicon_name != self.favicon.name:
+            resize_image(self.favicon, **IMAGE_PROFILES["favicon"])
 
+        # O manifest leva o título: um título novo também gera um conjunto novo
+        icons_dir = ""
         if self.favicon:
-            favicon_changed = current_favicon_name != self.favicon.name
+            try:
+                icons_dir = icons_dir_for(self.favicon, self.title)
+                build_icon_set(self.favicon, icons_dir, self.title)
+            except OSError:
+                # Favicon sumido do disco não impede salvar o resto
+                logger.exception("Não foi possível gerar os ícones do favicon")
+                icons_dir = self.icons_dir
+        if icons_dir != self.icons_dir:
+            SiteSetup.objects.filter(pk=self.pk).update(icons_dir=icons_dir)
+            self.icons_dir = icons_dir
 
-        if favicon_changed:
-            resize_image(self.favicon, 32)
+        return super_save
 
     def __str__(self):  # pylint: disable=E0307
         return self.title
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from site_setup.models import MenuLink, SiteSetup
+from site_setup.sites import clear_host_map
+from utils.http_cache import purge_keys
+
+
+@receiver(post_save, sender=MenuLink)
+@receiver(post_delete, sender=MenuLink)
+def touch_site_setup(sender, instance, **kwargs):
+    if instance.site_setup_id:
+        SiteSetup.objects.filter(pk=instance.site_setup_id).update(
+            updated_at=timezone.now()
+        )
+    # O mapa de domínios guarda o SiteSetup com o updated_at antigo
+    clear_host_map()
+    purge_keys("site")
+
+
+@receiver(post_save, sender=SiteSetup)
+@receiver(post_delete, sender=SiteSetup)
+def purge_site(sender, instance, **kwargs):
+    clear_host_map()
+    purge_keys("site")
@@ -0,0 +1,91 @@
+"""
+Qual SiteSetup atende cada domínio. O mapa domínio -> SiteSetup inteiro
+fica no cache: a requisição só consulta o banco quando o mapa expira ou é
+apagado pelos signals (site_setup/signals.py).
+
+Com o locmem o signal só apaga o mapa do processo que salvou. Por isso, a
+cada HOST_MAP_CHECK_TIMEOUT segundos, cada processo compara a versão do
+mapa (quantos SiteSetup e o maior updated_at) com a do banco.
+"""
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http.request import split_domain_port
+from site_setup.models import SiteSetup
+
+HOST_MAP_KEY = "site_setup:host_map"
+HOST_MAP_TIMEOUT = 60 * 5
+HOST_MAP_CHECKED_KEY = "site_setup:host_map_checked"
+HOST_MAP_CHECK_TIMEOUT = 5
+
+
+def host_map_version():
+    version = SiteSetup.objects.aggregate(count=Count("pk"), updated=Max("updated_at"))
+    return (version["count"], version["updated"])
+
+
+def build_host_map():
+    setups = list(SiteSetup.objects.order_by("-id"))
+    hosts = {}
+    for setup in setups:
+        for host in setup.host_list():
+            hosts.setdefault(host, setup.pk)
+
+    # Sem um padrão marcado vale o mais novo, como antes dos vários sites
+    default = next((setup.pk for setup in setups if setup.is_default), None)
+    if default is None and setups:
+        default = setups[0].pk
+
+    return {
+        "version": (
+            len(setups),
+            max((setup.updated_at for setup in setups), default=None),
+        ),
+        "hosts": hosts,
+        "default": default,
+        "setups": {setup.pk: setup for setup in setups},
+    }
+
+
+def get_host_map():
+    cached = cache.get_many([HOST_MAP_KEY, HOST_MAP_CHECKED_KEY])
+    host_map = cached.get(HOST_MAP_KEY)
+    if host_map is not None and HOST_MAP_CHECKED_KEY not in cached:
+        if host_map["version"] != host_map_version():
+            host_map = None
+        else:
+            cache.set(HOST_MAP_CHECKED_KEY, True, HOST_MAP_CHECK_TIMEOUT)
+    if host_map is None:
+        host_map = build_host_map()
+        cache.set(HOST_MAP_KEY, host_map, HOST_MAP_TIMEOUT)
+        cache.set(HOST_MAP_CHECKED_KEY, True, HOST_MAP_CHECK_TIMEOUT)
+    return host_map
+
+
+async def aget_host_map():
+    cached = await cache.aget_many([HOST_MAP_KEY, HOST_MAP_CHECKED_KEY])
+    host_map = cached.get(HOST_MAP_KEY)
+    if host_map is not None and HOST_MAP_CHECKED_KEY not in cached:
+        if host_map["version"] != await sync_to_async(host_map_version)():
+            host_map = None
+        else:
+            await cache.aset(HOST_MAP_CHECKED_KEY, True, HOST_MAP_CHECK_TIMEOUT)
+    if host_map is None:
+        host_map = await sync_to_async(build_host_map)()
+        await cache.aset(HOST_MAP_KEY, host_map, HOST_MAP_TIMEOUT)
+        await cache.aset(HOST_MAP_CHECKED_KEY, True, HOST_MAP_CHECK_TIMEOUT)
+    return host_map
+
+
+def clear_host_map():
+    cache.delete_many([HOST_MAP_KEY, HOST_MAP_CHECKED_KEY])
+
+
+def site_for_host(host_map, host):
+    domain, _ = split_domain_port(host)
+    pk = host_map["hosts"].get(domain, host_map["default"])
+    return host_map["setups"].get(pk)
+
+
+def is_single_site(host_map):
+    return len(host_map["setups"]) <= 1
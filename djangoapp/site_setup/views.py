@@ -1,3 +1,26 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.http import Http404
+from utils.media import serve_media
 
-# Create your views here.
+# Nomes que os navegadores pedem na raiz do site, sem olhar o <head>
+ROOT_ICONS = {
+    "favicon.ico": "favicon.ico",
+    "apple-touch-icon.png": "apple-touch-icon.png",
+    "apple-touch-icon-precomposed.png": "apple-touch-icon.png",
+    "site.webmanifest": "site.webmanifest",
+}
+
+
+def root_icon(request, name):
+    """
+    Entrega o ícone do SiteSetup do domínio na raiz do site. O endereço não
+    muda quando o favicon muda, então o cache aqui é o de MEDIA_CACHE_MAX_AGE,
+    não o "immutable" dos arquivos em assets/icons/.
+    """
+    setup = request.site_setup
+    if setup is None or not setup.icons_dir:
+        raise Http404()
+
+    response = serve_media(request, f"{setup.icons_dir}/{ROOT_ICONS[name]}")
+    response["Cache-Control"] = f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}"
+    return response
@@ -0,0 +1,37 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from axes.helpers import get_lockout_response
+from axes.middleware import AxesMiddleware
+from django.conf import settings
+
+
+class AdminAxesMiddleware(AxesMiddleware):
+    """
+    O AxesMiddleware só transforma um login bloqueado na resposta de
+    bloqueio; como só há login no admin, o resto do site passa direto.
+    Aceita o modo async para não obrigar o ASGI a adaptar a pilha inteira.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not request.path.startswith(settings.AXES_MIDDLEWARE_PATHS):
+            return self.get_response(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if not request.path.startswith(settings.AXES_MIDDLEWARE_PATHS):
+            return response
+
+        if settings.AXES_ENABLED and getattr(request, "axes_locked_out", None):
+            credentials = getattr(request, "axes_credentials", None)
+            response = await sync_to_async(get_lockout_response)(request, credentials)
+        return response
@@ -0,0 +1,141 @@
+"""
+Leituras públicas nas réplicas (DB_REPLICAS), o resto no primário.
+
+Fora de uma requisição marcada pelo ReplicaMiddleware (comandos, shell,
+migrations) tudo vai para o "default". Depois de uma escrita a sessão fica
+presa ao primário por DB_PRIMARY_STICKY_SECONDS (cookie), para quem acabou
+de salvar no admin ver o que salvou.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import DatabaseError
+
+STICKY_COOKIE = "use_primary"
+RETRY_AFTER = 30
+
+use_primary: ContextVar[bool] = ContextVar("use_primary", default=True)
+current_replica: ContextVar[str | None] = ContextVar("current_replica", default=None)
+
+# alias -> instante (time.monotonic) em que a réplica pode ser testada de novo
+_unavailable: dict[str, float] = {}
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+def is_available(alias):
+    if _unavailable.get(alias, 0) > time.monotonic():
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        _unavailable[alias] = time.monotonic() + RETRY_AFTER
+        return False
+    _unavailable.pop(alias, None)
+    return True
+
+
+def choose_replica():
+    """Uma réplica disponível por requisição; None se nenhuma responder."""
+    replica = current_replica.get()
+    if replica and is_available(replica):
+        return replica
+
+    candidates = replica_aliases()
+    random.shuffle(candidates)
+    for alias in candidates:
+        if is_available(alias):
+            current_replica.set(alias)
+            return alias
+    return None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if use_primary.get():
+            return DEFAULT_DB_ALIAS
+        return choose_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # O que for lido depois de uma escrita, na mesma requisição, também
+        # vem do primário.
+        use_primary.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas são cópias do default
+        return True
+
+
+def no_sticky_primary(view_func):
+    """
+    Para views não-GET que não gravam nada durante a requisição (o
+    contador de visualizações, por exemplo): não prendem a sessão ao
+    primário.
+    """
+    view_func.sticky_primary = False
+    return view_func
+
+
+class ReplicaMiddleware:
+    """
+    Libera as réplicas para GET/HEAD fora de DB_PRIMARY_PATHS (admin) e
+    sem o cookie de escrita recente; qualquer outro método grava o cookie.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = settings.DB_PRIMARY_STICKY_SECONDS
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def reads_from_replica(self, request):
+        return (
+            request.method in ("GET", "HEAD")
+            and STICKY_COOKIE not in request.COOKIES
+            and not request.path.startswith(settings.DB_PRIMARY_PATHS)
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.sticky_primary = getattr(view_func, "sticky_primary", True)
+
+    def process_response(self, request, response):
+        if request.method not in ("GET", "HEAD", "OPTIONS") and getattr(
+            request, "sticky_primary", True
+        ):
+            response.set_cookie(
+                STICKY_COOKIE, "1", max_age=self.sticky_seconds, httponly=True
+            )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        primary = use_primary.set(not self.reads_from_replica(request))
+        replica = current_replica.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            use_primary.reset(primary)
+            current_replica.reset(replica)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        primary = use_primary.set(not self.reads_from_replica(request))
+        replica = current_replica.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            use_primary.reset(primary)
+            current_replica.reset(replica)
+        return self.process_response(request, response)
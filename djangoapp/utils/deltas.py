@@ -0,0 +1,61 @@
+"""
+Diferenças compactas entre duas versões de um texto (HTML do summernote).
+
+O texto é quebrado depois de cada ">" e de cada quebra de linha; a
+diferença guarda só os trechos novos e, para o resto, o intervalo de
+pedaços que pode ser copiado da versão anterior. Tudo vai comprimido com
+zlib.
+"""
+import json
+import re
+import zlib
+from difflib import SequenceMatcher
+
+TOKEN_RE = re.compile(r"(?<=[>\n])")
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.split(text) if token]
+
+
+def pack(text):
+    return zlib.compress(text.encode("utf-8"))
+
+
+def unpack(data):
+    return zlib.decompress(data).decode("utf-8")
+
+
+def make_delta(base, text):
+    """Diferença de base para text, já comprimida."""
+    base_tokens = tokenize(base)
+    tokens = tokenize(text)
+    matcher = SequenceMatcher(None, base_tokens, tokens)
+
+    # [início, fim] copia pedaços de base; uma string é texto novo
+    ops = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(tokens[j1:j2]))
+
+    return zlib.compress(json.dumps(ops, separators=(",", ":")).encode("utf-8"))
+
+
+def apply_tokens(base_tokens, delta):
+    """
+    Como apply_delta, mas recebe e devolve a lista de pedaços: aplicar
+    várias diferenças seguidas não quebra o texto de novo a cada uma.
+    """
+    tokens = []
+    for op in json.loads(zlib.decompress(delta)):
+        if isinstance(op, str):
+            tokens.extend(tokenize(op))
+        else:
+            tokens.extend(base_tokens[op[0] : op[1]])
+    return tokens
+
+
+def apply_delta(base, delta):
+    return "".join(apply_tokens(tokenize(base), delta))
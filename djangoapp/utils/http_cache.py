@@ -0,0 +1,70 @@
+"""
+Cabeçalhos para o proxy de cache na frente do site e purge por
+Surrogate-Key.
+
+As views dizem por quanto tempo o proxy pode guardar a resposta
+(s-maxage + stale-while-revalidate) e quais objetos ela mostra
+("post-1", "tag-3"...). Quando um desses objetos muda, purge_keys pede ao
+proxy (CACHE_PURGE_URL) para descartar as respostas com aquelas chaves.
+"""
+import logging
+import urllib.request
+from urllib.error import URLError
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+logger = logging.getLogger(__name__)
+
+SURROGATE_KEY_HEADER = "Surrogate-Key"
+
+
+def apply_cache_policy(request, response, max_age, stale_while_revalidate, keys):
+    """
+    Marca a resposta como cacheável pelo proxy. O navegador sempre
+    revalida (max-age=0): só o proxy recebe os purges.
+    """
+    cacheable = (
+        request.method in ("GET", "HEAD")
+        and response.status_code == 200
+        and not response.cookies
+        and max_age > 0
+    )
+    if not cacheable:
+        patch_cache_control(response, private=True, max_age=0)
+        return response
+
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=0,
+        s_maxage=max_age,
+        stale_while_revalidate=stale_while_revalidate,
+    )
+    patch_vary_headers(response, ("Accept-Encoding",))
+    if keys:
+        response[SURROGATE_KEY_HEADER] = " ".join(dict.fromkeys(keys))
+    return response
+
+
+def send_purge(keys):
+    request = urllib.request.Request(
+        settings.CACHE_PURGE_URL,
+        method=settings.CACHE_PURGE_METHOD,
+        headers={SURROGATE_KEY_HEADER: " ".join(sorted(keys))},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=settings.CACHE_PURGE_TIMEOUT):
+            pass
+    except (URLError, OSError) as error:
+        # O pior caso é o proxy servir a versão antiga até o s-maxage vencer
+        logger.warning("Purge de %s falhou: %s", keys, error)
+
+
+def purge_keys(*keys):
+    """Pede o purge das chaves depois do commit da transação atual."""
+    keys = {key for key in keys if key}
+    if not settings.CACHE_PURGE_URL or not keys:
+        return
+    transaction.on_commit(lambda: send_purge(keys))
@@ -0,0 +1,89 @@
+"""
+Conjunto de ícones do site gerado a partir do favicon do SiteSetup: PNGs
+nos tamanhos que os navegadores pedem, favicon.ico, apple-touch-icon e o
+site.webmanifest. Tudo fica num diretório com o hash do favicon e do
+título no nome, então os arquivos nunca mudam (cache "immutable").
+"""
+import hashlib
+import json
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+ICONS_ROOT = "assets/icons"
+
+# nome do arquivo: (tamanho, fundo) — fundo None mantém a transparência
+PNG_ICONS = {
+    "favicon-16x16.png": (16, None),
+    "favicon-32x32.png": (32, None),
+    "apple-touch-icon.png": (180, "white"),
+    "android-chrome-192x192.png": (192, None),
+    "android-chrome-512x512.png": (512, None),
+}
+ICO_SIZES = ((16, 16), (32, 32), (48, 48))
+MANIFEST_ICONS = ("android-chrome-192x192.png", "android-chrome-512x512.png")
+
+
+def icons_dir_for(image_django, title):
+    """Diretório (relativo a MEDIA_ROOT) dos ícones desse favicon e título."""
+    digest = hashlib.sha256()
+    with image_django.open("rb") as file:
+        for chunk in file.chunks():
+            digest.update(chunk)
+    digest.update(title.encode("utf-8"))
+    return f"{ICONS_ROOT}/{digest.hexdigest()[:16]}"
+
+
+def square(image, size, background=None):
+    """A imagem inteira centralizada num quadrado size x size."""
+    image = ImageOps.contain(image, (size, size), Image.LANCZOS)
+    canvas = Image.new("RGBA", (size, size), background or (0, 0, 0, 0))
+    offset = ((size - image.width) // 2, (size - image.height) // 2)
+    canvas.paste(image, offset, image)
+    return canvas if background is None else canvas.convert("RGB")
+
+
+def build_icon_set(image_django, icons_dir, title):
+    """
+    Gera os ícones e o manifest em MEDIA_ROOT/icons_dir. Monta tudo num
+    diretório temporário e renomeia no fim: quem pedir um ícone nunca vê
+    o conjunto pela metade.
+    """
+    final = Path(settings.MEDIA_ROOT) / icons_dir
+    if final.is_dir():
+        return
+    target = final.with_name(f".{final.name}.tmp")
+    shutil.rmtree(target, ignore_errors=True)
+    target.mkdir(parents=True)
+
+    with Image.open(Path(settings.MEDIA_ROOT) / image_django.name) as source:
+        source = source.convert("RGBA")
+
+    for name, (size, background) in PNG_ICONS.items():
+        square(source, size, background).save(target / name, optimize=True)
+
+    square(source, 48).save(target / "favicon.ico", sizes=ICO_SIZES)
+
+    manifest = {
+        "name": title,
+        "short_name": title[:12],
+        "icons": [
+            {
+                # Relativo ao manifest, que fica no mesmo diretório
+                "src": name,
+                "sizes": f"{PNG_ICONS[name][0]}x{PNG_ICONS[name][0]}",
+                "type": "image/png",
+            }
+            for name in MANIFEST_ICONS
+        ],
+        "start_url": "/",
+        "display": "standalone",
+        "background_color": "#ffffff",
+        "theme_color": "#ffffff",
+    }
+    (target / "site.webmanifest").write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    target.rename(final)
@@ -1,9 +1,22 @@
+import base64
+from io import BytesIO
 from pathlib import Path
 
 from django.conf import settings
 from PIL import Image
 
 
+# Parâmetros do resize_image de cada tipo de imagem. O reprocess_media
+# usa os mesmos valores para reprocessar o que já foi enviado.
+IMAGE_PROFILES = {
+    "cover": {"new_width": 900, "optimize": True, "quality": 70},
+    "attachment": {"new_width": 900, "optimize": True, "quality": 70},
+    "avatar": {"new_width": 96, "optimize": True, "quality": 70},
+    # Fonte dos ícones de utils/icons.py, que vão até 512px
+    "favicon": {"new_width": 512, "optimize": True, "quality": 60},
+}
+
+
 def resize_image(image_django, new_width=800, optimize=True, quality=60):
     image_path = Path(settings.MEDIA_ROOT / image_django.name).resolve()
     image_pillow = Image.open(image_path)
@@ -21,3 +34,61 @@ def resize_image(image_django, new_width=800, optimize=True, quality=60):
         quality=quality,
     )
     return new_image
+
+
+# Largura da miniatura usada como placeholder (LQIP) enquanto a imagem carrega
+PLACEHOLDER_WIDTH = 16
+
+
+def image_metadata(image_django):
+    """
+    Largura, altura, cor dominante (#rrggbb) e um placeholder minúsculo
+    (data URI em JPEG) da imagem. Calculado uma vez, no upload; os templates
+    usam os valores gravados no banco sem abrir o arquivo.
+    """
+    image_path = Path(settings.MEDIA_ROOT / image_django.name).resolve()
+    with Image.open(image_path) as image_pillow:
+        width, height = image_pillow.size
+        rgb = image_pillow.convert("RGB")
+
+    red, green, blue = rgb.resize((1, 1), Image.BOX).getpixel((0, 0))
+
+    placeholder_height = max(1, round(PLACEHOLDER_WIDTH * height / width))
+    thumbnail = rgb.resize((PLACEHOLDER_WIDTH, placeholder_height), Image.BOX)
+    buffer = BytesIO()
+    thumbnail.save(buffer, "JPEG", quality=40)
+    placeholder = base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    return {
+        "width": width,
+        "height": height,
+        "color": f"#{red:02x}{green:02x}{blue:02x}",
+        "placeholder": f"data:image/jpeg;base64,{placeholder}",
+    }
+
+
+def reencode_image(path, new_width=800, optimize=True, quality=60):
+    """
+    Reduz para new_width (se for maior) e recodifica a imagem em path no
+    mesmo formato, sem tocar no arquivo: quem grava é o chamador, com outro
+    nome. Retorna (bytes antes, novo conteúdo ou None se não ficou menor,
+    nova largura, nova altura).
+    """
+    path = Path(path)
+    before = path.stat().st_size
+    with Image.open(path) as image_pillow:
+        image_format = image_pillow.format
+        original_width, original_height = width, height = image_pillow.size
+        if width > new_width:
+            height = round(new_width * height / width)
+            width = new_width
+            new_image = image_pillow.resize((width, height), Image.LANCZOS)
+        else:
+            image_pillow.load()
+            new_image = image_pillow.copy()
+
+    buffer = BytesIO()
+    new_image.save(buffer, image_format, optimize=optimize, quality=quality)
+    if buffer.tell() >= before:
+        return before, None, original_width, original_height
+    return before, buffer.getvalue(), width, height
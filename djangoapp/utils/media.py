@@ -0,0 +1,172 @@
+import mimetypes
+import posixpath
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+mimetypes.add_type("application/manifest+json", ".webmanifest")
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+class RangeFile:
+    """Arquivo aberto que só deixa ler `length` bytes a partir de `start`."""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        self.file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Retorna (start, end) inclusivo para um Range "bytes=a-b" simples, None
+    quando o cabeçalho deve ser ignorado (ausente, inválido ou múltiplos
+    intervalos) e levanta ValueError se o intervalo não é satisfazível.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    # Arquivo vazio: nenhum intervalo é satisfazível
+    if size == 0:
+        raise ValueError(header)
+
+    if not first:
+        # "bytes=-500": os últimos 500 bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, min(end, size - 1)
+
+
+def cache_max_age(path):
+    if path.startswith(tuple(settings.MEDIA_IMMUTABLE_PREFIXES)):
+        return IMMUTABLE_MAX_AGE, True
+    return settings.MEDIA_CACHE_MAX_AGE, False
+
+
+def set_cache_headers(response, path, etag, last_modified):
+    max_age, immutable = cache_max_age(path)
+    response["ETag"] = etag
+    response["Last-Modified"] = last_modified
+    patch_cache_control(response, public=True, max_age=max_age)
+    if immutable:
+        patch_cache_control(response, immutable=True)
+    return response
+
+
+def serve_media(request, path):
+    """
+    Serve arquivos de MEDIA_ROOT em produção.
+
+    Com MEDIA_SERVE_MODE="x-accel-redirect" (nginx) ou "x-sendfile" (apache,
+    lighttpd) o Django só valida o caminho e monta os cabeçalhos; o envio dos
+    bytes fica com o servidor web. No modo "django" o FileResponse usa o
+    wsgi.file_wrapper (sendfile no gunicorn/uwsgi) e atende Range.
+    """
+    path = posixpath.normpath(path).lstrip("/")
+    try:
+        fullpath = Path(safe_join(settings.MEDIA_ROOT, path))
+    except ValueError:
+        raise Http404()
+
+    try:
+        stat = fullpath.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404()
+    if not fullpath.is_file():
+        raise Http404()
+
+    size = stat.st_size
+    etag = quote_etag(f"{stat.st_mtime_ns:x}-{size:x}")
+    last_modified = http_date(stat.st_mtime)
+
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if not_modified is not None:
+        return set_cache_headers(not_modified, path, etag, last_modified)
+
+    content_type, encoding = mimetypes.guess_type(str(fullpath))
+    content_type = content_type or "application/octet-stream"
+    mode = settings.MEDIA_SERVE_MODE
+
+    if mode == "x-accel-redirect":
+        response = HttpResponse(content_type=content_type)
+        location = settings.MEDIA_ACCEL_REDIRECT_LOCATION.rstrip("/")
+        response["X-Accel-Redirect"] = f"{location}/{path}"
+    elif mode == "x-sendfile":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = str(fullpath)
+    else:
+        response = serve_file(
+            request, fullpath, size, etag, int(stat.st_mtime), content_type
+        )
+
+    if encoding:
+        response["Content-Encoding"] = encoding
+    response["Accept-Ranges"] = "bytes"
+    return set_cache_headers(response, path, etag, last_modified)
+
+
+def if_range_matches(if_range, etag, mtime):
+    """If-Range com o ETag ou com a data do Last-Modified (RFC 9110)."""
+    if if_range is None or if_range == etag:
+        return True
+    return parse_http_date_safe(if_range) == mtime
+
+
+def serve_file(request, fullpath, size, etag, mtime, content_type):
+    byte_range = None
+    if if_range_matches(request.headers.get("If-Range"), etag, mtime):
+        try:
+            byte_range = parse_range(request.headers.get("Range"), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if byte_range is None:
+        response = FileResponse(fullpath.open("rb"), content_type=content_type)
+        response["Content-Length"] = size
+        return response
+
+    start, end = byte_range
+    length = end - start + 1
+    response = FileResponse(
+        RangeFile(fullpath.open("rb"), start, length),
+        status=206,
+        content_type=content_type,
+    )
+    response["Content-Length"] = length
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
@@ -0,0 +1,217 @@
+"""
+Registro das requisições lentas em produção, sem DEBUG.
+
+Toda requisição é cronometrada. Numa fração delas (SLOW_REQUEST_SAMPLE) as
+consultas SQL são anotadas com o tempo de cada uma, e numa fração menor
+(SLOW_REQUEST_PROFILE_SAMPLE) a requisição roda sob o cProfile. As que
+passam de SLOW_REQUEST_MS viram uma linha JSON em SLOW_REQUEST_LOG, que
+gira a cada SLOW_REQUEST_LOG_MAX_BYTES. O comando slow_request_report
+resume o arquivo.
+
+Em respostas em streaming só o tempo até o início da resposta conta.
+"""
+import cProfile
+import json
+import logging
+import pstats
+import random
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger("slow_requests")
+
+# Consultas da requisição amostrada em andamento; None fora da amostra
+current_queries: ContextVar[list | None] = ContextVar("current_queries", default=None)
+
+MAX_QUERIES = 100
+MAX_SQL_LENGTH = 2000
+PROFILE_FUNCTIONS = 30
+
+
+def record_query(execute, sql, params, many, context):
+    queries = current_queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        queries.append(
+            (
+                context["connection"].alias,
+                sql,
+                (time.perf_counter() - start) * 1000,
+            )
+        )
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    # connection_created roda a cada reconexão do mesmo DatabaseWrapper
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def view_name(view_func):
+    view = getattr(view_func, "view_class", view_func)
+    return f"{view.__module__}.{view.__qualname__}"
+
+
+def profile_summary(profile):
+    """As funções com mais tempo próprio: [função, chamadas, tottime, cumtime]."""
+    stats = pstats.Stats(profile)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+    return [
+        [
+            f"{file}:{line}({name})",
+            calls,
+            round(tottime * 1000, 2),
+            round(cumtime * 1000, 2),
+        ]
+        for (file, line, name), (_, calls, tottime, cumtime, _) in rows[
+            :PROFILE_FUNCTIONS
+        ]
+    ]
+
+
+def log_handler():
+    path = Path(settings.SLOW_REQUEST_LOG)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Com vários processos gravando o mesmo arquivo, uma linha pode se
+    # perder na hora de girar; para uma amostra isso basta
+    handler = RotatingFileHandler(
+        path,
+        maxBytes=settings.SLOW_REQUEST_LOG_MAX_BYTES,
+        backupCount=settings.SLOW_REQUEST_LOG_BACKUPS,
+        encoding="utf-8",
+        delay=True,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+class SlowRequestMiddleware:
+    """
+    Desligado com SLOW_REQUEST_MS = 0. O cProfile só roda no modo síncrono:
+    no ASGI o event loop atende várias requisições na mesma thread e o
+    perfil misturaria todas.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SLOW_REQUEST_MS:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.threshold = settings.SLOW_REQUEST_MS
+        self.sample = settings.SLOW_REQUEST_SAMPLE
+        self.profile_sample = settings.SLOW_REQUEST_PROFILE_SAMPLE
+
+        # Um handler configurado em LOGGING tem preferência
+        if not logger.handlers:
+            logger.addHandler(log_handler())
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+        connection_created.connect(install_query_wrapper)
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.slow_request_view = view_name(view_func)
+        request.slow_request_template = getattr(
+            getattr(view_func, "view_class", None), "template_name", None
+        )
+
+    def start(self):
+        queries = [] if random.random() < self.sample else None
+        return current_queries.set(queries), time.perf_counter()
+
+    def finish(self, request, response, token, start, profile=None):
+        elapsed = (time.perf_counter() - start) * 1000
+        queries = current_queries.get()
+        current_queries.reset(token)
+        if profile is not None:
+            profile.disable()
+        if elapsed < self.threshold:
+            return
+
+        template = getattr(response, "template_name", None) or getattr(
+            request, "slow_request_template", None
+        )
+        if isinstance(template, str):
+            template = [template]
+
+        record = {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "method": request.method,
+            "path": request.path,
+            "host": request.get_host(),
+            "status": response.status_code,
+            "view": getattr(request, "slow_request_view", None),
+            "url_name": getattr(request.resolver_match, "url_name", None),
+            "templates": list(template) if template else [],
+            "ms": round(elapsed, 2),
+        }
+        if queries is not None:
+            record.update(
+                {
+                    "sql_count": len(queries),
+                    "sql_ms": round(sum(ms for _, _, ms in queries), 2),
+                    "sql": [
+                        {"db": alias, "ms": round(ms, 2), "sql": sql[:MAX_SQL_LENGTH]}
+                        for alias, sql, ms in queries[:MAX_QUERIES]
+                    ],
+                }
+            )
+        if profile is not None:
+            record["profile"] = profile_summary(profile)
+
+        logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+    def start_profile(self):
+        if random.random() >= self.profile_sample:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Outro profiler já ativo no processo (Python 3.12+)
+            return None
+        return profile
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token, start = self.start()
+        profile = self.start_profile()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            if profile is not None:
+                profile.disable()
+            current_queries.reset(token)
+            raise
+        self.finish(request, response, token, start, profile)
+        return response
+
+    async def __acall__(self, request):
+        token, start = self.start()
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            current_queries.reset(token)
+            raise
+        self.finish(request, response, token, start)
+        return response
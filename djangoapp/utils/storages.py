@@ -0,0 +1,37 @@
+import hashlib
+from pathlib import PurePosixPath
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+CHUNK_SIZE = 64 * 1024
+
+
+def file_digest(content, chunk_size=CHUNK_SIZE):
+    """SHA-256 do arquivo lido em blocos, sem carregar tudo na memória."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks(chunk_size):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Salva cada upload com o nome derivado do hash do conteúdo enviado:
+    "posts/2023/10/foto.jpg" vira "posts/ab/ab12...ef.jpg". Se o mesmo
+    arquivo já foi enviado antes, nada é gravado e o nome existente (já
+    redimensionado) é reaproveitado.
+    """
+
+    def content_name(self, name, digest):
+        path = PurePosixPath(name)
+        prefix = path.parts[0] if len(path.parts) > 1 else "cas"
+        return f"{prefix}/{digest[:2]}/{digest}{path.suffix.lower()}"
+
+    def _save(self, name, content):
+        name = self.content_name(name, file_digest(content))
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
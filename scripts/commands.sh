@@ -4,6 +4,10 @@
 set -e
 
 wait_psql.sh
-collectstatic.sh
+# FAST_BOOT=1: os estáticos já foram coletados no build da imagem (sem o
+# volume de /data/web/static do docker-compose).
+if [ "${FAST_BOOT:-0}" != "1" ]; then
+  collectstatic.sh
+fi
 migrate.sh
 runserver.sh
\ No newline at end of file
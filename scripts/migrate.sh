@@ -1,4 +1,9 @@
 #!/bin/sh
-makemigrations.sh
+# Só roda o migrate quando há migrations pendentes. As migrations são
+# geradas no desenvolvimento (makemigrations.sh), nunca na subida.
 echo 'Executando migrate.sh'
-python manage.py migrate --noinput
\ No newline at end of file
+if python manage.py migrate --check >/dev/null 2>&1; then
+  echo 'Nenhuma migration pendente'
+else
+  python manage.py migrate --noinput
+fi
\ No newline at end of file
@@ -1,2 +1,9 @@
 #!/bin/sh
-python manage.py runserver 0.0.0.0:8000
+
+# ASGI=1 sobe o projeto com uvicorn (project/asgi.py); combine com
+# BLOG_ASYNC_VIEWS=1 para usar as views async do blog.
+if [ "${ASGI:-0}" = "1" ]; then
+  uvicorn project.asgi:application --host 0.0.0.0 --port 8000 --workers "${WEB_CONCURRENCY:-1}"
+else
+  python manage.py runserver 0.0.0.0:8000
+fi